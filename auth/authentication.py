@@ -1,10 +1,124 @@
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
+import binascii
+from typing import Optional
 from fastapi import Depends, HTTPException
-from globals import api_key_header
+from globals import admin_key_header, api_key_header
+
+# session: Authorization là session_id tra trong session store (globals.sessions)
+# token: Authorization là token ký HMAC có hạn dùng, chữ ký kiểm tra ngay trong tiến trình; store chỉ
+#        được tra để biết token đã logout (thu hồi) chưa
+AUTH_MODE = os.getenv("AUTH_MODE", "session").lower()
+if AUTH_MODE not in ("session", "token"):
+    raise ValueError(f"Unknown AUTH_MODE '{AUTH_MODE}', expected session or token")
+# Không đặt ADMIN_TOKEN thì các endpoint /admin/* bị tắt (403)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", os.getenv("SESSION_TTL_SECONDS", "86400")))
+
+def _load_secret() -> bytes:
+    secret = os.getenv("AUTH_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    if AUTH_MODE == "token":
+        # Khóa ngẫu nhiên mỗi tiến trình thì token chỉ hợp lệ trên worker đã cấp nó: dừng ngay lúc khởi động
+        raise ValueError("AUTH_SECRET must be set when AUTH_MODE=token")
+    # Chế độ session không ký token nào; khóa chỉ để issue_token vẫn gọi được
+    return secrets.token_bytes(32)
+
+_SECRET = _load_secret()
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_SECRET, payload.encode("ascii"), hashlib.sha256).digest())
+
+def issue_token(user_id: int, ttl_seconds: int = AUTH_TOKEN_TTL_SECONDS) -> str:
+    """Token dạng <payload base64url>.<HMAC-SHA256 base64url>, payload gồm sub, exp và jti."""
+    payload = _b64encode(json.dumps(
+        {"sub": user_id, "exp": int(time.time()) + ttl_seconds, "jti": secrets.token_hex(8)},
+        separators=(",", ":"),
+    ).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+def decode_token(sessions, token: str) -> Optional[dict]:
+    """
+    Trả về payload nếu chữ ký đúng, token còn hạn và chưa bị thu hồi; ngược lại None.
+    Danh sách token đã thu hồi nằm trong session store để mọi worker cùng thấy.
+    """
+    payload, _, signature = token.partition(".")
+    try:
+        if not signature or not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] <= time.time() or sessions.is_revoked(claims["jti"]):
+            return None
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        return None
+    return claims
+
+def revoke_token(sessions, token: str) -> bool:
+    claims = decode_token(sessions, token)
+    if claims is None:
+        return False
+    sessions.revoke(claims["jti"], claims["exp"])
+    return True
+
+def create_credential(sessions, user_id: int) -> str:
+    """Giá trị Authorization trả về lúc đăng nhập: token (AUTH_MODE=token) hoặc session_id."""
+    if AUTH_MODE == "token":
+        return issue_token(user_id)
+    return sessions.create(user_id)
+
+def revoke_credential(sessions, credential: str) -> bool:
+    """Logout: thu hồi token hoặc xóa session. Trả về False nếu credential không hợp lệ."""
+    if AUTH_MODE == "token":
+        return revoke_token(sessions, credential)
+    return sessions.delete(credential)
+
+def auth_stats(sessions) -> dict:
+    if AUTH_MODE == "token":
+        return {"mode": AUTH_MODE, "token_ttl_seconds": AUTH_TOKEN_TTL_SECONDS, "store": sessions.stats()}
+    return {"mode": AUTH_MODE, "store": sessions.stats()}
 
 # Dependency to get the current user
-def get_user_dependency(sessions: dict):
+def get_user_dependency(sessions):
+    if AUTH_MODE == "token":
+        def user_from_token(session_id: Optional[str]) -> int:
+            claims = decode_token(sessions, session_id) if session_id else None
+            if claims is None:
+                raise HTTPException(status_code=401, detail="Unauthorized")
+            return claims["sub"]  # Return user_id
+
+        if not sessions.blocking:
+            # Store trong tiến trình: xác thực token chỉ tốn vài micro giây CPU, chạy thẳng trên event loop
+            async def token_dependency(session_id: str = Depends(api_key_header)):
+                return user_from_token(session_id)
+            return token_dependency
+
+        # sqlite/redis: tra token đã thu hồi là I/O chặn, để FastAPI chạy trong threadpool
+        def blocking_token_dependency(session_id: str = Depends(api_key_header)):
+            return user_from_token(session_id)
+        return blocking_token_dependency
+
     def dependency(session_id: str = Depends(api_key_header)):
-        if session_id is None or session_id not in sessions:
+        user_id = sessions.get(session_id) if session_id else None
+        if user_id is None:
             raise HTTPException(status_code=401, detail="Unauthorized")
-        return sessions[session_id]  # Return user_id
-    return dependency
\ No newline at end of file
+        return user_id
+    return dependency
+
+def require_admin(admin_token: str = Depends(admin_key_header)):
+    """Dependency cho router /admin: yêu cầu header X-Admin-Token trùng ADMIN_TOKEN."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if admin_token is None or not hmac.compare_digest(admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Unauthorized")
@@ -0,0 +1,83 @@
+"""
+Băm và kiểm tra mật khẩu bằng scrypt (hashlib, không cần thư viện ngoài).
+
+Chuỗi lưu trong SysUser.Password có dạng scrypt$<n>$<r>$<p>$<salt>$<hash> (base64) nên
+mỗi bản ghi tự mang tham số băm của nó: đổi PASSWORD_SCRYPT_N/R/P không làm hỏng mật khẩu
+cũ, chúng được băm lại với tham số mới ở lần đăng nhập thành công tiếp theo. Mật khẩu
+plaintext từ trước khi có module này cũng được chuyển sang scrypt theo cách đó.
+
+Mỗi lần băm tốn hàng chục mili giây CPU nên các hàm async chạy trong password_pool
+(hashlib.scrypt nhả GIL), không chặn event loop.
+"""
+import os
+import hmac
+import base64
+import hashlib
+import secrets
+import binascii
+from typing import Optional, Tuple
+from utils.executors import password_pool
+
+SCHEME = "scrypt"
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # scrypt cần khoảng 128 * n * r * p byte; mặc định của OpenSSL (32 MiB) quá nhỏ khi tăng n
+    maxmem = 128 * n * r * (p + 1) + 1024 * 1024
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=HASH_BYTES)
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+def hash_password(password: str, n: Optional[int] = None, r: Optional[int] = None, p: Optional[int] = None) -> str:
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+def _parse(stored: str) -> Optional[tuple]:
+    parts = stored.split("$")
+    if len(parts) != 6 or parts[0] != SCHEME:
+        return None
+    try:
+        return int(parts[1]), int(parts[2]), int(parts[3]), base64.b64decode(parts[4]), base64.b64decode(parts[5])
+    except (ValueError, binascii.Error):
+        return None
+
+def is_hashed(stored: str) -> bool:
+    return _parse(stored) is not None
+
+def needs_rehash(stored: str) -> bool:
+    """True nếu mật khẩu còn là plaintext hoặc được băm với tham số khác cấu hình hiện tại."""
+    params = _parse(stored)
+    return params is None or params[:3] != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+def verify_password(password: str, stored: str) -> bool:
+    params = _parse(stored)
+    if params is None:
+        # Bản ghi cũ lưu plaintext
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    n, r, p, salt, expected = params
+    return hmac.compare_digest(_scrypt(password, salt, n, r, p), expected)
+
+def verify_and_update(password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Kiểm tra mật khẩu; trả về (đúng/sai, chuỗi băm mới nếu cần lưu lại).
+    `stored` là None (không có user) vẫn tốn một lần băm để thời gian phản hồi
+    không tiết lộ email nào đã đăng ký.
+    """
+    if stored is None:
+        hash_password(password)
+        return False, None
+    if not verify_password(password, stored):
+        return False, None
+    return True, hash_password(password) if needs_rehash(stored) else None
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_and_update_async(password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+    return await password_pool.run(verify_and_update, password, stored)
@@ -0,0 +1,263 @@
+import os
+import time
+import heapq
+import sqlite3
+import logging
+import threading
+from uuid import uuid4
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def new_session_id() -> str:
+    return uuid4().hex
+
+class MemorySessionStore:
+    """
+    Session trong tiến trình, có TTL. Hạn dùng được giữ trong một min-heap nên mỗi lần
+    thao tác chỉ cần lấy ra các session đã hết hạn ở đỉnh heap (O(log n) mỗi session),
+    không phải duyệt toàn bộ dict. Số session bị chặn bởi `max_entries`.
+    Token đã thu hồi (AUTH_MODE=token) được giữ đến hạn dùng của token theo cùng cách.
+    Chỉ dùng được khi chạy một worker; nhiều worker cần backend sqlite hoặc redis.
+    """
+
+    blocking = False
+
+    def __init__(self, ttl_seconds: float = 86400, max_entries: int = 100000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._sessions = {}  # session_id -> (expires_at, user_id)
+        self._expiry = []  # heap (expires_at, session_id); phần tử cũ được bỏ qua khi lấy ra
+        self._revoked = {}  # jti -> exp (giây epoch) của token đã logout
+        self._revoked_expiry = []  # heap (exp, jti)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _purge(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, session_id = heapq.heappop(self._expiry)
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] == expires_at:
+                del self._sessions[session_id]
+                self.expired += 1
+        # Heap chỉ chứa phần tử cũ (session đã logout) thì dựng lại để không phình ra
+        if len(self._expiry) > 2 * len(self._sessions) + 64:
+            self._expiry = [(expires_at, session_id) for session_id, (expires_at, _) in self._sessions.items()]
+            heapq.heapify(self._expiry)
+
+    def create(self, user_id: int) -> str:
+        session_id = new_session_id()
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            # Đầy thì bỏ session sắp hết hạn nhất
+            while len(self._sessions) >= self.max_entries and self._expiry:
+                expires_at, old_id = heapq.heappop(self._expiry)
+                entry = self._sessions.get(old_id)
+                if entry is not None and entry[0] == expires_at:
+                    del self._sessions[old_id]
+                    self.evicted += 1
+            expires_at = now + self.ttl_seconds
+            self._sessions[session_id] = (expires_at, user_id)
+            heapq.heappush(self._expiry, (expires_at, session_id))
+            self.created += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] <= now:
+                return None
+            return entry[1]
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _purge_revoked(self, now: float) -> None:
+        # Token hết hạn tự mất hiệu lực nên không cần nhớ là đã thu hồi nữa
+        while self._revoked_expiry and self._revoked_expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._revoked_expiry)
+            self._revoked.pop(jti, None)
+
+    def revoke(self, jti: str, exp: float) -> None:
+        with self._lock:
+            self._purge_revoked(time.time())
+            if jti not in self._revoked:
+                self._revoked[jti] = exp
+                heapq.heappush(self._revoked_expiry, (exp, jti))
+
+    def is_revoked(self, jti: str) -> bool:
+        # Đọc dict không cần khóa; token hết hạn đã bị từ chối trước khi tra ở đây
+        return jti in self._revoked
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge(time.monotonic())
+            self._purge_revoked(time.time())
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "revoked_tokens": len(self._revoked),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+class SQLiteSessionStore:
+    """
+    Session lưu trong một file SQLite dùng chung giữa các worker trên cùng máy
+    (chế độ WAL, mỗi thread một kết nối). Session hết hạn bị xóa theo index expires_at
+    sau mỗi `purge_every` lần tạo session; token đã thu hồi hết hạn bị xóa lúc thu hồi token khác.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, purge_every: int = 100):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._creates = 0
+        self.expired = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS revoked_tokens (jti TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at ON revoked_tokens (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, user_id: int) -> str:
+        session_id = new_session_id()
+        now = time.time()  # đồng hồ thực: các tiến trình phải so sánh cùng mốc thời gian
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, user_id, expires_at) VALUES (?, ?, ?)",
+                (session_id, user_id, now + self.ttl_seconds),
+            )
+            self._creates += 1
+            if self._creates % self.purge_every == 0:
+                self.expired += conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,)).rowcount
+        return session_id
+
+    def get(self, session_id: str) -> Optional[int]:
+        row = self._connect().execute(
+            "SELECT user_id FROM sessions WHERE session_id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def revoke(self, jti: str, exp: float) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (time.time(),))
+            conn.execute("INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", (jti, exp))
+
+    def is_revoked(self, jti: str) -> bool:
+        return self._connect().execute(
+            "SELECT 1 FROM revoked_tokens WHERE jti = ? AND expires_at > ?", (jti, time.time())
+        ).fetchone() is not None
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        now = time.time()
+        total, active = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(expires_at > ?), 0) FROM sessions", (now,)
+        ).fetchone()
+        revoked = conn.execute("SELECT COUNT(*) FROM revoked_tokens WHERE expires_at > ?", (now,)).fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": active,
+            "revoked_tokens": revoked,
+            "expired_pending_purge": total - active,
+            "ttl_seconds": self.ttl_seconds,
+            "expired": self.expired,
+        }
+
+class RedisSessionStore:
+    """Session và token đã thu hồi trên Redis (dùng chung giữa các worker và các máy), TTL do Redis quản lý."""
+
+    blocking = True
+
+    def __init__(self, url: str, ttl_seconds: float = 86400, prefix: str = "session:",
+                 revoked_prefix: str = "revoked:"):
+        import redis
+
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.revoked_prefix = revoked_prefix
+        self._client = redis.Redis.from_url(url)
+        self.errors = 0
+
+    def create(self, user_id: int) -> str:
+        session_id = new_session_id()
+        self._client.setex(self.prefix + session_id, int(self.ttl_seconds), user_id)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[int]:
+        try:
+            raw = self._client.get(self.prefix + session_id)
+        except Exception as e:
+            # Không đọc được session thì coi như chưa đăng nhập (401), không trả về 500
+            self.errors += 1
+            logger.warning(f"Session store read failed: {e}")
+            return None
+        return int(raw) if raw is not None else None
+
+    def delete(self, session_id: str) -> bool:
+        return self._client.delete(self.prefix + session_id) > 0
+
+    def revoke(self, jti: str, exp: float) -> None:
+        # Khóa tự hết hạn cùng lúc với token
+        ttl = int(exp - time.time()) + 1
+        if ttl > 0:
+            self._client.setex(self.revoked_prefix + jti, ttl, 1)
+
+    def is_revoked(self, jti: str) -> bool:
+        try:
+            return self._client.exists(self.revoked_prefix + jti) > 0
+        except Exception as e:
+            # Không kiểm tra được thì từ chối token (401) thay vì chấp nhận token có thể đã logout
+            self.errors += 1
+            logger.warning(f"Session store read failed: {e}")
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl_seconds,
+            "errors": self.errors,
+        }
+
+def create_session_store():
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", "86400"))
+    if backend == "redis":
+        return RedisSessionStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl_seconds)
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_SQLITE_PATH", os.path.join(BASE_DIR, "sessions.sqlite3")), ttl_seconds)
+    return MemorySessionStore(ttl_seconds, int(os.getenv("SESSION_MAX_ENTRIES", "100000")))
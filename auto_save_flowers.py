@@ -1,60 +1,142 @@
+"""
+Tự động lưu thông tin hoa vào cơ sở dữ liệu dựa trên các hình ảnh có sẵn trong thư mục media/flowers/<flower_type>.
+
+    python auto_save_flowers.py                  # chỉ quét thư mục có thay đổi từ lần chạy trước
+    python auto_save_flowers.py --full           # quét lại toàn bộ
+    python auto_save_flowers.py --chunk-size 5000 --workers 8
+"""
 import os
+import json
+import time
 import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.models import Flower as FlowerModel
-from config.db import FLOWER_TYPE_DIRS, get_db
-from decimal import Decimal
+from config.db import BASE_DIR, get_db
+from utils.flower_types import flower_type_index
+
+# Lưu mtime của từng thư mục ở lần chạy trước để lần sau bỏ qua thư mục không đổi
+STATE_FILE = os.getenv("AUTO_SAVE_STATE_FILE", os.path.join(BASE_DIR, ".auto_save_flowers_state.json"))
+DEFAULT_CHUNK_SIZE = 1000
 
-def auto_save_flowers_from_images(db: Session):
+def _load_state() -> dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state: dict) -> None:
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+def _scan_folder(flower_type: str, folder_path: str) -> list:
+    """Liệt kê file ảnh của một loại hoa bằng os.scandir (không stat từng file)."""
+    image_urls = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            # Bỏ qua thư mục, file ẩn và file upload đang ghi dở (.part)
+            if entry.name.startswith(".") or entry.name.endswith(".part") or not entry.is_file():
+                continue
+            # Đường dẫn tương đối so với media/flowers, ví dụ: rose/abc.jpg (như các lần nhập trước)
+            image_urls.append(os.path.join(flower_type, entry.name))
+    image_urls.sort()
+    return image_urls
+
+def _new_flower(flower_type: str, image_url: str, number: int) -> dict:
+    # Tạo dữ liệu mẫu cho mỗi hình ảnh
+    return {
+        "name": f"{flower_type.capitalize()} {number}",  # Tên hoa theo định dạng "Daisy 1", "Daisy 2", ...
+        "description": f"A beautiful {flower_type} flower.",
+        "price": Decimal(random.uniform(5.0, 20.0)).quantize(Decimal("0.01")),  # Giá ngẫu nhiên từ 5.00 đến 20.00
+        "stock_quantity": random.randint(10, 100),  # Số lượng ngẫu nhiên từ 10 đến 100
+        "flower_type": flower_type,
+        "image_url": image_url,
+    }
+
+def auto_save_flowers_from_images(db: Session, full_scan: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                  workers: int = None) -> dict:
     """
-    Tự động lưu thông tin hoa vào cơ sở dữ liệu dựa trên các hình ảnh có sẵn trong thư mục media/flowers/<flower_type>.
+    Nhập hàng loạt: tải sẵn tập image_url đã có, quét các thư mục song song, chỉ quét
+    thư mục đã thay đổi từ lần chạy trước (trừ khi `full_scan`), rồi chèn theo từng
+    khối `chunk_size` bản ghi bằng bulk_insert_mappings. Trả về thống kê của lần chạy.
     """
-    for flower_type, folder_path in FLOWER_TYPE_DIRS.items():
+    started = time.perf_counter()
+    state = {} if full_scan else _load_state()
+
+    # Các loại hoa và thư mục ảnh lấy từ bảng FlowerTypes
+    flower_type_index.refresh(db, force=True)
+    folders = {}
+    for flower_type, folder_path in ((entry.key, entry.flower_dir) for entry in flower_type_index.all()):
         if not os.path.exists(folder_path):
             print(f"Folder not found for flower type '{flower_type}': {folder_path}")
             continue
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+        # Thêm/xóa file làm thay đổi mtime của thư mục
+        if state.get(flower_type) == mtime_ns:
+            print(f"'{flower_type}' unchanged since last run. Skipping...")
+            continue
+        folders[flower_type] = (folder_path, mtime_ns)
 
-        # Duyệt qua tất cả các file trong thư mục
-        flower_count = 1  # Đếm số lượng hoa để đặt tên
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
+    # Một truy vấn cho mọi image_url đã có thay vì một SELECT cho mỗi file
+    existing_urls = {url for (url,) in db.query(FlowerModel.image_url).filter(FlowerModel.image_url.isnot(None))}
+    # Đánh số tiếp theo số hoa đã có của từng loại
+    type_counts = dict(db.query(FlowerModel.flower_type, func.count(FlowerModel.id)).group_by(FlowerModel.flower_type))
 
-            # Bỏ qua nếu không phải file
-            if not os.path.isfile(file_path):
-                continue
+    with ThreadPoolExecutor(max_workers=workers or max(1, len(folders))) as executor:
+        scanned = dict(zip(folders, executor.map(lambda item: _scan_folder(item[0], item[1][0]), folders.items())))
 
-            # Tạo dữ liệu mẫu cho mỗi hình ảnh
-            flower_name = f"{flower_type.capitalize()} {flower_count}"  # Tên hoa theo định dạng "Daisy 1", "Daisy 2", ...
-            description = f"A beautiful {flower_type} flower."
-            price = Decimal(random.uniform(5.0, 20.0)).quantize(Decimal("0.01"))  # Giá ngẫu nhiên từ 5.00 đến 20.00
-            stock_quantity = random.randint(10, 100)  # Số lượng ngẫu nhiên từ 10 đến 100
-            image_url = os.path.relpath(file_path, start=os.path.join(FLOWER_TYPE_DIRS[flower_type], ".."))
-
-            # Kiểm tra xem bản ghi đã tồn tại chưa (dựa trên image_url)
-            existing_flower = db.query(FlowerModel).filter(FlowerModel.image_url == image_url).first()
-            if existing_flower:
-                print(f"Flower with image '{image_url}' already exists. Skipping...")
+    rows = []
+    scanned_files = 0
+    for flower_type, image_urls in scanned.items():
+        scanned_files += len(image_urls)
+        number = type_counts.get(flower_type, 0)
+        for image_url in image_urls:
+            if image_url in existing_urls:
                 continue
+            number += 1
+            rows.append(_new_flower(flower_type, image_url, number))
+    scan_seconds = time.perf_counter() - started
+    print(f"Scanned {scanned_files} files in {len(scanned)} folders ({scan_seconds:.2f}s), {len(rows)} new flowers")
 
-            # Tạo bản ghi mới
-            new_flower = FlowerModel(
-                name=flower_name,
-                description=description,
-                price=price,
-                stock_quantity=stock_quantity,
-                flower_type=flower_type,
-                image_url=image_url
-            )
-            db.add(new_flower)
-            print(f"Added flower: {flower_name} with image '{image_url}'")
+    inserted = 0
+    insert_started = time.perf_counter()
+    for offset in range(0, len(rows), chunk_size):
+        chunk = rows[offset:offset + chunk_size]
+        db.bulk_insert_mappings(FlowerModel, chunk)
+        db.commit()
+        inserted += len(chunk)
+        elapsed = time.perf_counter() - insert_started
+        print(f"Inserted {inserted}/{len(rows)} flowers ({inserted / elapsed if elapsed else 0:.0f} rows/s)")
 
-            flower_count += 1  # Tăng số thứ tự hoa
+    # Chỉ ghi nhận thư mục đã nhập xong để lần sau bỏ qua
+    state.update({flower_type: mtime_ns for flower_type, (_, mtime_ns) in folders.items()})
+    _save_state(state)
 
-    # Commit tất cả thay đổi vào cơ sở dữ liệu
-    db.commit()
-    print("All flowers have been added to the database.")
+    total_seconds = time.perf_counter() - started
+    stats = {
+        "folders_scanned": len(scanned),
+        "files_scanned": scanned_files,
+        "inserted": inserted,
+        "skipped_existing": scanned_files - inserted,
+        "seconds": round(total_seconds, 3),
+        "rows_per_second": round(inserted / total_seconds, 1) if total_seconds else 0.0,
+    }
+    print(f"All flowers have been added to the database: {stats}")
+    return stats
 
 # Sử dụng hàm
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="Rescan every folder, ignoring the last-run state")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="Folders scanned in parallel (default: one per folder)")
+    args = parser.parse_args()
+
     with next(get_db()) as db:
-        auto_save_flowers_from_images(db)
\ No newline at end of file
+        auto_save_flowers_from_images(db, full_scan=args.full, chunk_size=args.chunk_size, workers=args.workers)
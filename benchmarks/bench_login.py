@@ -0,0 +1,79 @@
+"""
+Đo thông lượng kiểm tra mật khẩu lúc đăng nhập (auth/passwords.py) và độ trễ event loop:
+- inline: gọi verify_and_update ngay trong coroutine (như đặt bcrypt thẳng vào handler async)
+- pool: verify_and_update_async chạy trong password_pool
+
+Trong lúc chạy, một coroutine tick mỗi 1 ms đo độ trễ lớn nhất của event loop, tức thời
+gian mà mọi request khác (kể cả request không cần đăng nhập) bị treo.
+
+    python -m benchmarks.bench_login                          # tham số scrypt theo env
+    python -m benchmarks.bench_login --logins 200 --concurrency 32
+    PASSWORD_SCRYPT_N=32768 PASSWORD_POOL_SIZE=8 python -m benchmarks.bench_login
+"""
+import time
+import json
+import asyncio
+import argparse
+from auth.passwords import SCRYPT_N, SCRYPT_R, SCRYPT_P, hash_password, verify_and_update, verify_and_update_async
+from utils.executors import password_pool
+
+async def _measure_loop_lag(stop: asyncio.Event, lags: list) -> None:
+    interval = 0.001
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+async def _run(mode: str, stored: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            if mode == "inline":
+                ok, _ = verify_and_update("correct horse", stored)
+            else:
+                ok, _ = await verify_and_update_async("correct horse", stored)
+            assert ok
+
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(_measure_loop_lag(stop, lags))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "logins": logins,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(logins / elapsed, 1),
+        "loop_lag_p50_ms": round(lags[len(lags) // 2] * 1000, 2) if lags else None,
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2) if lags else None,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"], choices=["inline", "pool"])
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stored = hash_password("correct horse")
+    hash_ms = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({
+        "scrypt": {"n": SCRYPT_N, "r": SCRYPT_R, "p": SCRYPT_P},
+        "hash_ms": round(hash_ms, 2),
+        "password_pool_workers": password_pool.max_workers,
+    }))
+    for mode in args.modes:
+        print(json.dumps(asyncio.run(_run(mode, stored, args.logins, args.concurrency))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+So sánh tiền xử lý cũ (giải mã đầy đủ -> BGR2RGB -> resize -> /255) với
+inference.preprocessing (giải mã JPEG độ phân giải giảm + batch buffer + chuẩn hóa gộp).
+
+    python -m benchmarks.bench_preprocess --width 4032 --height 3024 --repeats 20
+    python -m benchmarks.bench_preprocess --image path/to/photo.jpg
+"""
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+from inference.preprocessing import preprocess_batch, preprocess_bytes
+
+def legacy_preprocess(contents: bytes, target_size=(224, 224)) -> np.ndarray:
+    """Bản sao của routers.flowers.preprocess_image trước khi tối ưu (kèm bước giải mã)."""
+    img = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    img = cv2.resize(img, target_size, interpolation=cv2.INTER_AREA)
+    img = img.astype(np.float32) / 255.0
+    return np.expand_dims(img, axis=0)
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    """Ảnh JPEG có chi tiết giống ảnh chụp (gradient + nhiễu) để bộ giải mã phải làm việc thật."""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = rng.normal(0, 20, (height, width, 3))
+    img = np.clip(base + noise, 0, 255).astype(np.uint8)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return buf.tobytes()
+
+def _time(fn, repeats: int) -> float:
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            contents = f.read()
+    else:
+        contents = synthetic_photo(args.width, args.height)
+
+    legacy_ms = _time(lambda: legacy_preprocess(contents), args.repeats)
+    optimized_ms = _time(lambda: preprocess_bytes(contents), args.repeats)
+
+    batch = [contents] * args.batch_size
+    buffer = np.empty((args.batch_size, 224, 224, 3), dtype=np.float32)
+    legacy_batch_ms = _time(lambda: np.concatenate([legacy_preprocess(c) for c in batch]), max(1, args.repeats // 4))
+    optimized_batch_ms = _time(lambda: preprocess_batch(batch, out=buffer), max(1, args.repeats // 4))
+
+    difference = np.abs(legacy_preprocess(contents)[0] - preprocess_bytes(contents))
+    print(json.dumps({
+        "input_bytes": len(contents),
+        "legacy_ms": round(legacy_ms, 2),
+        "optimized_ms": round(optimized_ms, 2),
+        "speedup": round(legacy_ms / optimized_ms, 2),
+        "batch_size": args.batch_size,
+        "legacy_batch_ms": round(legacy_batch_ms, 2),
+        "optimized_batch_ms": round(optimized_batch_ms, 2),
+        "max_abs_pixel_diff": round(float(difference.max()), 4),
+        "mean_abs_pixel_diff": round(float(difference.mean()), 4),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Đo thời gian `import main` (khởi động worker) cho từng APP_ROLE trong tiến trình Python mới,
+và ghi thêm kết quả vào benchmarks/startup_history.jsonl để theo dõi theo thời gian.
+
+    python -m benchmarks.bench_startup                   # mọi vai trò, 5 lần mỗi vai trò
+    python -m benchmarks.bench_startup --roles api --repeats 10 --no-record
+    python -m benchmarks.bench_startup --max-seconds 2   # thoát mã 1 nếu median vượt ngưỡng (CI)
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_FILE = os.path.join(BASE_DIR, "benchmarks", "startup_history.jsonl")
+ROLES = ["all", "api", "inference"]
+# Module nặng cần theo dõi: có bị nạp lúc khởi động hay không
+HEAVY_MODULES = ["tensorflow", "cv2", "pandas", "numpy", "inference.model_registry"]
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+def measure(role: str) -> dict:
+    env = dict(os.environ, APP_ROLE=role, MODEL_PRELOAD="0")
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def _git_revision() -> str:
+    """Commit hiện tại, thêm hậu tố -dirty nếu có thay đổi chưa commit."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", nargs="+", default=ROLES, choices=ROLES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-record", action="store_true", help="Do not append to startup_history.jsonl")
+    parser.add_argument("--max-seconds", type=float, help="Fail if a role's median import time exceeds this")
+    args = parser.parse_args()
+
+    revision = _git_revision()
+    failed = False
+    for role in args.roles:
+        runs = [measure(role) for _ in range(args.repeats)]
+        seconds = [run["seconds"] for run in runs]
+        result = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": revision,
+            "python": platform.python_version(),
+            "role": role,
+            "repeats": args.repeats,
+            "median_ms": round(statistics.median(seconds) * 1000, 1),
+            "min_ms": round(min(seconds) * 1000, 1),
+            "heavy_modules_loaded": runs[-1]["loaded"],
+        }
+        print(json.dumps(result))
+        if not args.no_record:
+            with open(HISTORY_FILE, "a", encoding="utf-8") as history:
+                history.write(json.dumps(result) + "\n")
+        if args.max_seconds and result["median_ms"] > args.max_seconds * 1000:
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
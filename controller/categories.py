@@ -1,37 +1,48 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from schemas.categories import CategoryCreate
 from models.models import Categories
+from utils.paginator import paginate_keyed
+from utils.reference_cache import ReferenceCache
 
-def create_category(db: Session, category: CategoryCreate) -> Categories:
+# Bảng nhỏ, hiếm khi đổi: đọc từ bộ nhớ, các hàm ghi bên dưới vô hiệu cache qua commit_changes
+categories_cache = ReferenceCache(Categories)
+
+async def create_category(db: AsyncSession, category: CategoryCreate) -> Categories:
     db_category = Categories(
         Name=category.Name,
         Description=category.Description
     )
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await categories_cache.commit_changes(db)
+    await db.refresh(db_category)
     return db_category
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Categories]:
-    return db.query(Categories).offset(skip).limit(limit).all()
+async def get_categories(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[dict]:
+    return (await categories_cache.rows(db))[skip:skip + limit]
+
+async def get_categories_page(db: AsyncSession, page: int = 1, per_page: int = 10, cursor: Optional[str] = None) -> dict:
+    return paginate_keyed(await categories_cache.rows(db), "id", page=page, per_page=per_page, cursor=cursor)
+
+async def get_cached_category(db: AsyncSession, category_id: int) -> Optional[dict]:
+    return await categories_cache.get(db, category_id)
 
-def get_category_by_id(db: Session, category_id: int) -> Optional[Categories]:
-    return db.query(Categories).filter(Categories.id == category_id).first()
+async def get_category_by_id(db: AsyncSession, category_id: int) -> Optional[Categories]:
+    return await db.get(Categories, category_id)
 
-def update_category(db: Session, category_id: int, category_data: CategoryCreate) -> Optional[Categories]:
-    db_category = get_category_by_id(db, category_id)
+async def update_category(db: AsyncSession, category_id: int, category_data: CategoryCreate) -> Optional[Categories]:
+    db_category = await get_category_by_id(db, category_id)
     if db_category:
         db_category.Name = category_data.Name
         db_category.Description = category_data.Description
-        db.commit()
-        db.refresh(db_category)
+        await categories_cache.commit_changes(db)
+        await db.refresh(db_category)
     return db_category
 
-def delete_category(db: Session, category_id: int) -> Optional[Categories]:
-    db_category = get_category_by_id(db, category_id)
+async def delete_category(db: AsyncSession, category_id: int) -> Optional[Categories]:
+    db_category = await get_category_by_id(db, category_id)
     if db_category:
-        db.delete(db_category)
-        db.commit()
+        await db.delete(db_category)
+        await categories_cache.commit_changes(db)
         return db_category
-    return None
\ No newline at end of file
+    return None
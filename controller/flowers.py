@@ -4,7 +4,9 @@ from schemas.flowers import FlowerCreate, FlowerUpdate
 from typing import List, Optional
 from fastapi import UploadFile, HTTPException
 from utils.file_handler import save_image, delete_image
-from config.db import MEDIA_ROOT, FLOWER_IMAGE_DIR_RELATIVE  
+from utils.image_cache import image_cache
+from utils.media import flower_image_path
+from utils.paginator import paginate_query
 import logging
 
 logger = logging.getLogger(__name__)
@@ -88,6 +90,19 @@ def get_flowers(db: Session, skip: int = 0, limit: int = 100) -> List[FlowerMode
     """Lấy danh sách flowers."""
     return db.query(FlowerModel).offset(skip).limit(limit).all()
 
+def get_flowers_page(
+    db: Session,
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    flower_type: Optional[str] = None
+) -> dict:
+    """Lấy một trang flowers (có thể lọc theo loại hoa), phân trang trong SQL."""
+    query = db.query(FlowerModel)
+    if flower_type is not None:
+        query = query.filter(FlowerModel.flower_type == flower_type)
+    return paginate_query(query, FlowerModel.id, page=page, per_page=per_page, cursor=cursor)
+
 def update_flower(db: Session, flower_id: int, flower_data: FlowerUpdate, image_file: Optional[UploadFile]) -> FlowerModel:
     """Cập nhật thông tin flower, có thể thay ảnh mới."""
     db_flower = get_flower(db, flower_id)
@@ -95,9 +110,10 @@ def update_flower(db: Session, flower_id: int, flower_data: FlowerUpdate, image_
     update_data = flower_data.dict(exclude_unset=True)  # Chỉ lấy các trường được gửi lên
     new_image_path = None
     old_image_path = db_flower.image_url  # Lưu lại đường dẫn ảnh cũ
+    old_image_file = flower_image_path(db_flower)
 
     if image_file:  # Nếu có ảnh mới được upload
-        new_image_path = save_image(image_file, MEDIA_ROOT, FLOWER_IMAGE_DIR_RELATIVE)
+        new_image_path = save_image(image_file, update_data.get('flower_type', db_flower.flower_type))
         update_data['image_url'] = new_image_path  # Cập nhật image_url trong data sẽ set
 
     # Cập nhật các trường khác
@@ -111,6 +127,9 @@ def update_flower(db: Session, flower_id: int, flower_data: FlowerUpdate, image_
     # Nếu có ảnh mới được lưu thành công VÀ có ảnh cũ -> Xóa ảnh cũ
     if new_image_path and old_image_path:
         delete_image(old_image_path)
+    # Ảnh cũ không còn được dùng (hoặc loại hoa đổi thư mục) -> bỏ khỏi cache Base64
+    if old_image_file:
+        image_cache.invalidate(old_image_file)
 
     logger.info(f"Updated flower {db_flower.id}. New image path: {new_image_path}")
     return db_flower
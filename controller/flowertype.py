@@ -1,34 +1,59 @@
-from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from schemas.flowertype import FlowerTypeCreate
 from models.models import FlowerTypes
+from utils.paginator import paginate_keyed
+from utils.reference_cache import ReferenceCache
+from utils.flower_types import flower_type_index, is_valid_flower_type_name
 
-def create_flower_type(db: Session, flower_type: FlowerTypeCreate) -> FlowerTypes:
+# Bảng nhỏ, hiếm khi đổi: đọc từ bộ nhớ, các hàm ghi bên dưới vô hiệu cache qua commit_changes
+flower_types_cache = ReferenceCache(FlowerTypes)
+
+async def _commit_changes(db: AsyncSession) -> None:
+    await flower_types_cache.commit_changes(db)
+    # Bảng tra id/tên/thư mục (utils/flower_types.py) đọc lại ở lần tra tiếp theo
+    flower_type_index.invalidate()
+
+def _check_name(name: str) -> None:
+    # Name là tên thư mục ảnh và tên lớp của mô hình (utils/flower_types.py)
+    if not is_valid_flower_type_name(name):
+        raise HTTPException(status_code=400, detail="Flower type name may only contain letters, digits, '_' and '-'")
+
+async def create_flower_type(db: AsyncSession, flower_type: FlowerTypeCreate) -> FlowerTypes:
+    _check_name(flower_type.Name)
     db_flower_type = FlowerTypes(Name=flower_type.Name, Description=flower_type.Description)
     db.add(db_flower_type)
-    db.commit()
-    db.refresh(db_flower_type)
+    await _commit_changes(db)
+    await db.refresh(db_flower_type)
     return db_flower_type
 
-def get_flower_types(db: Session, skip: int = 0, limit: int = 100) -> List[FlowerTypes]:
-    return db.query(FlowerTypes).offset(skip).limit(limit).all()
+async def get_flower_types(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[dict]:
+    return (await flower_types_cache.rows(db))[skip:skip + limit]
+
+async def get_flower_types_page(db: AsyncSession, page: int = 1, per_page: int = 10, cursor: Optional[str] = None) -> dict:
+    return paginate_keyed(await flower_types_cache.rows(db), "id", page=page, per_page=per_page, cursor=cursor)
+
+async def get_cached_flower_type(db: AsyncSession, flower_type_id: int) -> Optional[dict]:
+    return await flower_types_cache.get(db, flower_type_id)
 
-def get_flower_type_by_id(db: Session, flower_type_id: int) -> Optional[FlowerTypes]:
-    return db.query(FlowerTypes).filter(FlowerTypes.id == flower_type_id).first()
+async def get_flower_type_by_id(db: AsyncSession, flower_type_id: int) -> Optional[FlowerTypes]:
+    return await db.get(FlowerTypes, flower_type_id)
 
-def update_flower_type(db: Session, flower_type_id: int, flower_type_data: FlowerTypeCreate) -> Optional[FlowerTypes]:
-    db_flower_type = get_flower_type_by_id(db, flower_type_id)
+async def update_flower_type(db: AsyncSession, flower_type_id: int, flower_type_data: FlowerTypeCreate) -> Optional[FlowerTypes]:
+    _check_name(flower_type_data.Name)
+    db_flower_type = await get_flower_type_by_id(db, flower_type_id)
     if db_flower_type:
         db_flower_type.Name = flower_type_data.Name
         db_flower_type.Description = flower_type_data.Description
-        db.commit()
-        db.refresh(db_flower_type)
+        await _commit_changes(db)
+        await db.refresh(db_flower_type)
     return db_flower_type
 
-def delete_flower_type(db: Session, flower_type_id: int) -> Optional[FlowerTypes]:
-    db_flower_type = get_flower_type_by_id(db, flower_type_id)
+async def delete_flower_type(db: AsyncSession, flower_type_id: int) -> Optional[FlowerTypes]:
+    db_flower_type = await get_flower_type_by_id(db, flower_type_id)
     if db_flower_type:
-        db.delete(db_flower_type)
-        db.commit()
+        await db.delete(db_flower_type)
+        await _commit_changes(db)
         return db_flower_type
     return None
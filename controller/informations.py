@@ -1,12 +1,13 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from auth.authentication import get_user_dependency
 from models.models import Informations as Info, SysUser
 from schemas.informations import CreateInformation, UpdateInformation, ResponseInformation
 from globals import sessions
 
-def create_information(
-        db: Session, 
+async def create_information(
+        db: AsyncSession, 
         information: CreateInformation,
         user_id: int = Depends(get_user_dependency(sessions))
     ): 
@@ -20,27 +21,33 @@ def create_information(
         UserId=user_id
     )
     db.add(db_information)
-    db.commit()
-    db.refresh(db_information)
+    await db.commit()
+    await db.refresh(db_information)
     return db_information
 
-def update_information(db: Session, information_id: int, information: UpdateInformation):
-    db_information = db.query(Info).filter(Info.id == information_id).first()
+async def update_information(db: AsyncSession, information_id: int, information: UpdateInformation):
+    db_information = await db.get(Info, information_id)
     if db_information:
         db_information.FirstName = information.first_name
         db_information.LastName = information.last_name
         db_information.FullName = information.first_name + " " + information.last_name
         db_information.DateOfBirth = information.date_of_birth
         db_information.Address = information.address
-        db.commit()
-        db.refresh(db_information)
+        await db.commit()
+        await db.refresh(db_information)
     return db_information
 
-def get_information_by_user_id(db: Session, user_id: int):
-    db_information = db.query(Info).filter(Info.UserId == user_id).first()
-    db_user = db.query(SysUser).filter(SysUser.id == user_id).first()
-    if db_information is None or db_user is None:
+async def get_information_by_user_id(db: AsyncSession, user_id: int):
+    # Một truy vấn JOIN thay vì hai lượt đi-về tới database
+    row = (await db.execute(
+        select(Info, SysUser)
+        .join(SysUser, SysUser.id == Info.UserId)
+        .where(Info.UserId == user_id)
+        .limit(1)
+    )).first()
+    if row is None:
         return None
+    db_information, db_user = row
     
     res_info = ResponseInformation(
         id=db_information.id,
@@ -51,7 +58,6 @@ def get_information_by_user_id(db: Session, user_id: int):
         gender=db_information.Gender,
         address=db_information.Address,
         user_id=db_information.UserId,
-        email=db_user.Email,
-        password=db_user.Password
+        email=db_user.Email
     )
     return res_info
\ No newline at end of file
@@ -4,20 +4,19 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from schemas.products import ProductCreate, ProductUpdate
 from models.models import Products
+from utils.paginator import paginate_query
+from utils.image_variants import generate_all_variants
+from utils.uploads import save_upload
+from utils.flower_types import flower_type_index
+from config.db import BASE_DIR
 
 def create_product(db: Session, product_data: ProductCreate, file: UploadFile) -> Products:
     try:
         # Đường dẫn thư mục lưu trữ hình ảnh dựa trên FlowerTypeID
-        BASE_MEDIA_PATH = "media/flowers/flowers_shop/"
-        flower_type_map = {
-            1: "Daisy",
-            2: "Dandelion",
-            3: "Rose",
-            4: "Sunflower",
-            5: "Tulip"
-        }
-        folder_name = flower_type_map.get(product_data.FlowerTypeID, "Unknown")
-        folder_path = os.path.join(BASE_MEDIA_PATH, folder_name)
+        flower_type = flower_type_index.get(product_data.FlowerTypeID)
+        if flower_type is None:
+            raise HTTPException(status_code=400, detail=f"Invalid FlowerTypeID: {product_data.FlowerTypeID}")
+        folder_path = flower_type.product_dir
         os.makedirs(folder_path, exist_ok=True)
 
         # Tạo sản phẩm mới (chưa lưu hình ảnh)
@@ -40,21 +39,44 @@ def create_product(db: Session, product_data: ProductCreate, file: UploadFile) -
         file_extension = os.path.splitext(file.filename)[1]  # Lấy phần mở rộng của file (vd: .jpg, .png)
         file_name = f"{db_product.id}{file_extension}"  # Tên file là ID của sản phẩm
         file_path = os.path.join(folder_path, file_name)
-        with open(file_path, "wb") as f:
-            f.write(file.file.read())
+        try:
+            save_upload(file.file, file_path)
+        except HTTPException:
+            # Ảnh bị từ chối (quá lớn) -> không giữ lại sản phẩm không có ảnh
+            db.delete(db_product)
+            db.commit()
+            raise
+        generate_all_variants(file_path)
 
-        # Cập nhật đường dẫn hình ảnh vào sản phẩm
-        db_product.ImageURL = file_path
+        # Cập nhật đường dẫn hình ảnh vào sản phẩm (tương đối so với thư mục dự án như trước)
+        db_product.ImageURL = os.path.relpath(file_path, BASE_DIR)
         db.commit()
         db.refresh(db_product)
 
         return db_product
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating product: {str(e)}")
 
 def get_products(db: Session, skip: int = 0, limit: int = 100) -> List[Products]:
     return db.query(Products).offset(skip).limit(limit).all()
 
+def get_products_page(
+    db: Session,
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    flower_type_id: Optional[int] = None
+) -> dict:
+    """
+    Lấy một trang sản phẩm (có thể lọc theo FlowerTypeID), phân trang trong SQL.
+    """
+    query = db.query(Products)
+    if flower_type_id is not None:
+        query = query.filter(Products.FlowerTypeID == flower_type_id)
+    return paginate_query(query, Products.id, page=page, per_page=per_page, cursor=cursor)
+
 def get_product_by_id(db: Session, product_id: int) -> Optional[Products]:
     """
     Lấy thông tin chi tiết của một sản phẩm dựa trên ID.
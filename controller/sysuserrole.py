@@ -1,12 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import SysUserRole
 
-def create_sysuserrole(db: Session, userId: int):
+async def create_sysuserrole(db: AsyncSession, userId: int):
     db_sysUserRole = SysUserRole(
         UserId=userId,
         RoleId=2 # value 2: is customer
     )
     db.add(db_sysUserRole)
-    db.commit()
-    db.refresh(db_sysUserRole)
-    return db_sysUserRole
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_sysUserRole)
+    return db_sysUserRole
@@ -1,27 +1,35 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import SysUser
+from auth.passwords import hash_password_async, verify_and_update_async
 from schemas.users import UserAuth
 from controller.sysuserrole import create_sysuserrole
 
-def create_user(db: Session, user: UserAuth):
+async def create_user(db: AsyncSession, user: UserAuth):
     db_user = SysUser(
         Email=user.email,
-        Password=user.password,
+        Password=await hash_password_async(user.password),
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     # create instance sys_user_role
-    db_sysUserRole = create_sysuserrole(db, db_user.id)
-    db.add(db_sysUserRole)
-    db.refresh(db_sysUserRole)
+    await create_sysuserrole(db, db_user.id)
     return db_user
 
-def get_user(db: Session, user_id: int):
-    return db.query(SysUser).filter(SysUser.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(SysUser, user_id)
 
-def authenticate_user(db: Session, user: UserAuth):
-    db_user = db.query(SysUser).filter(SysUser.Email == user.email).first()
-    if db_user is None or db_user.Password != user.password:
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(SysUser).where(SysUser.Email == email).limit(1))
+
+async def authenticate_user(db: AsyncSession, user: UserAuth):
+    db_user = await get_user_by_email(db, user.email)
+    is_valid, new_hash = await verify_and_update_async(user.password, db_user.Password if db_user else None)
+    if not is_valid:
         return None
-    return db_user
\ No newline at end of file
+    if new_hash:
+        # Mật khẩu plaintext cũ hoặc tham số băm đã đổi: lưu lại chuỗi băm mới
+        db_user.Password = new_hash
+        await db.commit()
+    return db_user
@@ -1,5 +1,9 @@
 from fastapi.security import APIKeyHeader
+from auth.session_store import create_session_store
 
 
-sessions = {}
-api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
\ No newline at end of file
+# session_id -> user_id, có TTL; SESSION_BACKEND=sqlite|redis để dùng chung giữa các worker
+sessions = create_session_store()
+api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
+# Token dùng chung cho các endpoint /admin/* (biến môi trường ADMIN_TOKEN)
+admin_key_header = APIKeyHeader(name="X-Admin-Token", auto_error=False)
\ No newline at end of file
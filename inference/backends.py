@@ -0,0 +1,105 @@
+import os
+import threading
+import numpy as np
+
+class KerasBackend:
+    """Chạy mô hình bằng tf.keras (mặc định)."""
+    name = "keras"
+
+    def __init__(self, model_path: str):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self._model = tf.keras.models.load_model(model_path)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self._model.predict(batch, verbose=0)
+
+class TFLiteBackend:
+    """
+    Chạy mô hình .tflite (có thể đã lượng tử hóa dynamic/INT8).
+    Dùng tflite_runtime nếu có, nếu không thì tf.lite.
+    """
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: int = None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self._interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = None
+        # Interpreter không thread-safe
+        self._lock = threading.Lock()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if self._batch_size != len(batch):
+                self._interpreter.resize_tensor_input(self._input["index"], [len(batch), *batch.shape[1:]])
+                self._interpreter.allocate_tensors()
+                self._input = self._interpreter.get_input_details()[0]
+                self._output = self._interpreter.get_output_details()[0]
+                self._batch_size = len(batch)
+
+            # Mô hình lượng tử hóa toàn phần nhận input số nguyên: x_q = x / scale + zero_point
+            if self._input["dtype"] != np.float32:
+                scale, zero_point = self._input["quantization"]
+                batch = np.round(batch / scale + zero_point).astype(self._input["dtype"])
+            self._interpreter.set_tensor(self._input["index"], batch)
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output["index"])
+
+            if self._output["dtype"] != np.float32:
+                scale, zero_point = self._output["quantization"]
+                output = (output.astype(np.float32) - zero_point) * scale
+            return output
+
+class OnnxBackend:
+    """Chạy mô hình .onnx bằng ONNX Runtime trên CPU."""
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: int = None):
+        import onnxruntime as ort
+
+        self.model_path = model_path
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: batch.astype(np.float32, copy=False)})[0]
+
+BACKENDS = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+# Phần mở rộng mặc định khi không cấu hình đường dẫn riêng cho backend
+_DEFAULT_EXTENSIONS = {"tflite": ".tflite", "onnx": ".onnx"}
+
+def backend_model_path(name: str, model_path: str) -> str:
+    """Đường dẫn file mô hình cho backend: TFLITE_MODEL_PATH / ONNX_MODEL_PATH hoặc suy ra từ MODEL_PATH."""
+    if name == KerasBackend.name:
+        return model_path
+    configured = os.getenv(f"{name.upper()}_MODEL_PATH")
+    if configured:
+        return configured
+    return os.path.splitext(model_path)[0] + _DEFAULT_EXTENSIONS[name]
+
+def load_backend(name: str, model_path: str):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}. Choose one of {sorted(BACKENDS)}")
+    path = backend_model_path(name, model_path)
+    if name == KerasBackend.name:
+        return KerasBackend(path)
+    num_threads = int(os.getenv("INFERENCE_NUM_THREADS", "0")) or None
+    return BACKENDS[name](path, num_threads=num_threads)
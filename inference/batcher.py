@@ -0,0 +1,118 @@
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Callable
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class InferenceBatcher:
+    """
+    Gom ảnh từ nhiều request đồng thời thành một batch rồi chạy mô hình một lần.
+
+    Request gọi `await batcher.predict(image)`; một thread nền lấy ảnh khỏi hàng đợi
+    cho tới khi đủ `max_batch_size` ảnh hoặc hết `max_wait_ms` kể từ ảnh đầu tiên,
+    chạy `predict_fn` trên cả batch (ngoài event loop) và trả kết quả về từng request.
+
+    `concurrency` > 1 chạy nhiều thread gom batch song song (vd. một thread cho mỗi
+    worker process). Với `stack=False`, `predict_fn` nhận danh sách ảnh và tự ghép batch
+    (vd. ghi thẳng vào shared memory của worker).
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 concurrency: int = 1, stack: bool = True):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.concurrency = max(1, concurrency)
+        self.stack = stack
+        self._queue = queue.Queue()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.max_batch_seen = 0
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if not self._threads:
+                for i in range(self.concurrency):
+                    thread = threading.Thread(target=self._run, name=f"inference-batcher-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+
+    async def predict(self, image: np.ndarray) -> np.ndarray:
+        """Dự đoán một ảnh đã tiền xử lý (không có chiều batch). Trả về vector xác suất."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((image, future, loop))
+        return await future
+
+    def _collect_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        buffer = None  # batch buffer cấp phát sẵn của thread này, dùng lại giữa các batch
+        while True:
+            batch = self._collect_batch()
+            with self._stats_lock:
+                self.batches += 1
+                self.images += len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            try:
+                images = [image for image, _, _ in batch]
+                if self.stack:
+                    buffer = self._ensure_buffer(buffer, images[0])
+                    predictions = self.predict_fn(np.stack(images, out=buffer[:len(images)]))
+                else:
+                    predictions = self.predict_fn(images)
+                for (_, future, loop), prediction in zip(batch, predictions):
+                    loop.call_soon_threadsafe(_set_result, future, prediction)
+            except Exception as e:
+                logger.error(f"Batched inference failed: {e}", exc_info=True)
+                for _, future, loop in batch:
+                    loop.call_soon_threadsafe(_set_exception, future, e)
+
+    def _ensure_buffer(self, buffer, first: np.ndarray) -> np.ndarray:
+        """Ghép ảnh vào batch buffer cấp phát sẵn thay vì tạo mảng mới cho mỗi batch."""
+        if buffer is None or buffer.shape[1:] != first.shape or buffer.dtype != first.dtype:
+            buffer = np.empty((self.max_batch_size, *first.shape), dtype=first.dtype)
+        return buffer
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "concurrency": self.concurrency,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": self.images / self.batches if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+        }
+
+def _set_result(future: asyncio.Future, result) -> None:
+    # Request có thể đã bị hủy (client ngắt kết nối) trong lúc chờ batch
+    if not future.done():
+        future.set_result(result)
+
+def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+    if not future.done():
+        future.set_exception(exc)
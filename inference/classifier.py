@@ -0,0 +1,118 @@
+import os
+import asyncio
+import numpy as np
+from typing import Optional
+from fastapi import HTTPException
+from inference import model_registry
+from inference.batcher import InferenceBatcher
+from inference.model_registry import CLASS_NAMES, CONFIDENCE_THRESHOLD, ENTROPY_THRESHOLD, INFERENCE_BACKEND, MODEL_PATH
+from inference.prediction_cache import content_digest, content_key, prediction_cache
+from inference.preprocessing import preprocess_bytes
+from utils.executors import run_cpu, run_io
+
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+# Số worker process giữ mô hình (inference/worker_pool.py); 0 = chạy mô hình trong tiến trình này
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+# Thời gian tối đa (giây) chờ một worker process trả kết quả một batch trước khi coi nó bị treo
+INFERENCE_WORKER_TIMEOUT = float(os.getenv("INFERENCE_WORKER_TIMEOUT", "60"))
+
+# Hàng đợi gom batch dùng chung cho /flowers/predict và /products/predict
+if INFERENCE_WORKERS > 0:
+    from inference.worker_pool import InferenceWorkerPool
+
+    worker_pool = InferenceWorkerPool(
+        INFERENCE_WORKERS,
+        max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+        input_shape=model_registry.INPUT_SHAPE,
+        num_classes=len(CLASS_NAMES),
+        batch_timeout=INFERENCE_WORKER_TIMEOUT,
+    )
+    # Mỗi worker một thread gom batch; ảnh được ghép thẳng vào shared memory của worker
+    batcher = InferenceBatcher(
+        worker_pool.predict,
+        max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=INFERENCE_MAX_WAIT_MS,
+        concurrency=INFERENCE_WORKERS,
+        stack=False,
+    )
+else:
+    worker_pool = None
+    batcher = InferenceBatcher(
+        model_registry.predict,
+        max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=INFERENCE_MAX_WAIT_MS,
+    )
+# Đổi mô hình/backend thì khóa cache cũng đổi theo
+CACHE_NAMESPACE = f"{os.path.basename(MODEL_PATH or '')}:{INFERENCE_BACKEND}"
+# Ảnh đang được dự đoán: request trùng nội dung (client retry) chờ chung một kết quả
+_in_flight = {}
+
+def warm_up():
+    """Load mô hình ở nền: trong tiến trình này hoặc khởi động các worker process."""
+    if worker_pool is not None:
+        return worker_pool.start_in_background()
+    return model_registry.warm_up_in_background()
+
+def inference_status() -> dict:
+    """Trạng thái sẵn sàng của mô hình cho endpoint quản trị."""
+    if worker_pool is not None:
+        return {"ready": worker_pool.status == "ready", "execution": "process", **worker_pool.stats()}
+    return {"ready": model_registry.is_ready(), "execution": "in_process", **model_registry.model_status()}
+
+async def _predict(contents: bytes) -> dict:
+    """Giải mã, tiền xử lý và chạy mô hình; trả về xác suất + độ tin cậy + entropy."""
+    # Giải mã + tiền xử lý ảnh trong pool CPU để không chặn event loop
+    img_processed = await run_cpu(preprocess_bytes, contents)
+
+    if img_processed is None:
+        raise HTTPException(status_code=400, detail="Không thể giải mã ảnh từ dữ liệu tải lên")
+
+    # Dự đoán (gom batch với các request đồng thời khác)
+    probabilities = await batcher.predict(img_processed)
+    predicted_class = int(np.argmax(probabilities))
+
+    return {
+        "predicted_class": predicted_class,
+        "confidence": float(probabilities[predicted_class]),
+        # Tính entropy để kiểm tra độ chắc chắn
+        "entropy": float(-np.sum(probabilities * np.log(probabilities + 1e-10))),
+        "probabilities": [float(p) for p in probabilities],
+    }
+
+async def classify_image(contents: bytes, content_hash: Optional[str] = None) -> dict:
+    """
+    Nhận diện loài hoa từ nội dung file ảnh. Kết quả được cache theo hash nội dung
+    (`content_hash` nếu đã băm trong lúc đọc upload),
+    nên ảnh đã upload trước đó không phải giải mã và chạy mô hình lại.
+    Ném HTTPException 400 nếu không giải mã được ảnh hoặc độ tin cậy quá thấp.
+    """
+    if content_hash is None:
+        content_hash = await run_cpu(content_digest, contents)
+    cache_key = content_key(content_hash, CACHE_NAMESPACE)
+    if prediction_cache.blocking:
+        result = await run_io(prediction_cache.get, cache_key)
+    else:
+        result = prediction_cache.get(cache_key)
+    if result is None:
+        task = _in_flight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(_predict(contents))
+            _in_flight[cache_key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(cache_key, None))
+        result = await asyncio.shield(task)
+        if prediction_cache.blocking:
+            await run_io(prediction_cache.set, cache_key, result)
+        else:
+            prediction_cache.set(cache_key, result)
+
+    # Kiểm tra độ tin cậy và entropy
+    if result["confidence"] < CONFIDENCE_THRESHOLD or result["entropy"] > ENTROPY_THRESHOLD:
+        raise HTTPException(status_code=400, detail="Không thể nhận diện loài hoa / Vật thể từ ảnh này")
+
+    return {
+        "flower_name": CLASS_NAMES[result["predicted_class"]],
+        "confidence": result["confidence"],
+        "entropy": result["entropy"],
+        "probabilities": result["probabilities"],
+    }
@@ -0,0 +1,222 @@
+"""
+Chuyển mô hình Keras (MODEL_PATH) sang TFLite/ONNX và so sánh các backend.
+
+    # Chuyển đổi (quantize: none | dynamic | int8)
+    python -m inference.convert_model convert --format tflite --quantize int8
+    python -m inference.convert_model convert --format onnx --quantize dynamic
+
+    # So sánh độ chính xác, độ trễ, bộ nhớ trên tập ảnh giữ lại: <holdout-dir>/<class_name>/*.jpg
+    python -m inference.convert_model evaluate --holdout-dir data/holdout
+
+Ảnh hiệu chuẩn cho INT8 mặc định lấy từ media/flowers/<loại hoa>.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import cv2
+import numpy as np
+from config.db import FLOWER_IMAGE_DIR_ABSOLUTE
+from inference.backends import BACKENDS, backend_model_path, load_backend
+from inference.model_registry import CLASS_NAMES, MODEL_PATH
+from inference.preprocessing import preprocess_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+def _iter_images(folders, limit: int = None):
+    count = 0
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            img = cv2.imread(entry.path, cv2.IMREAD_COLOR)
+            if img is None:
+                continue
+            yield entry.path, preprocess_image(img)
+            count += 1
+            if limit and count >= limit:
+                return
+
+def _load_holdout(holdout_dir: str):
+    """Đọc tập giữ lại: trả về (batch ảnh, nhãn đúng theo chỉ số trong CLASS_NAMES)."""
+    images, labels = [], []
+    for label, class_name in enumerate(CLASS_NAMES):
+        for _, img in _iter_images([os.path.join(holdout_dir, class_name)]):
+            images.append(img[0])
+            labels.append(label)
+    if not images:
+        raise SystemExit(f"No held-out images found under {holdout_dir}/<class_name>/")
+    return np.stack(images), np.array(labels)
+
+def _convert_tflite(model, output_path: str, quantize: str, calibration_dirs, calibration_size: int):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize in ("dynamic", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "int8":
+        def representative_dataset():
+            for _, img in _iter_images(calibration_dirs, limit=calibration_size):
+                yield [img]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+def _convert_onnx(model, output_path: str, quantize: str, calibration_dirs, calibration_size: int):
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name="input"),)
+    float_path = output_path if quantize == "none" else output_path + ".float.onnx"
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=float_path)
+    if quantize == "none":
+        return
+
+    from onnxruntime.quantization import CalibrationDataReader, QuantType, quantize_dynamic, quantize_static
+
+    if quantize == "dynamic":
+        quantize_dynamic(float_path, output_path, weight_type=QuantType.QInt8)
+    else:
+        class _Reader(CalibrationDataReader):
+            def __init__(self):
+                self._images = _iter_images(calibration_dirs, limit=calibration_size)
+
+            def get_next(self):
+                item = next(self._images, None)
+                return None if item is None else {"input": item[1]}
+
+        quantize_static(float_path, output_path, _Reader(), weight_type=QuantType.QInt8, activation_type=QuantType.QUInt8)
+    os.remove(float_path)
+
+def convert(args) -> None:
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(args.model_path)
+    output_path = args.output or backend_model_path(args.format, args.model_path)
+    if args.calibration_dir:
+        calibration_dirs = [os.path.join(args.calibration_dir, name) for name in CLASS_NAMES]
+    else:
+        calibration_dirs = [os.path.join(FLOWER_IMAGE_DIR_ABSOLUTE, name) for name in CLASS_NAMES]
+
+    started = time.perf_counter()
+    if args.format == "tflite":
+        _convert_tflite(model, output_path, args.quantize, calibration_dirs, args.calibration_size)
+    else:
+        _convert_onnx(model, output_path, args.quantize, calibration_dirs, args.calibration_size)
+    print(json.dumps({
+        "format": args.format,
+        "quantize": args.quantize,
+        "output": output_path,
+        "size_bytes": os.path.getsize(output_path),
+        "seconds": round(time.perf_counter() - started, 2),
+    }))
+
+def _max_rss_bytes() -> int:
+    # ru_maxrss tính bằng KB trên Linux, byte trên macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def _benchmark_backend(name: str, model_path: str, holdout_dir: str, repeats: int) -> dict:
+    """Đo một backend trong tiến trình hiện tại (được gọi trong subprocess riêng để đo bộ nhớ chính xác)."""
+    images, labels = _load_holdout(holdout_dir)
+    rss_before = _max_rss_bytes()
+    started = time.perf_counter()
+    backend = load_backend(name, model_path)
+    load_seconds = time.perf_counter() - started
+
+    backend.predict(images[:1])  # warm-up
+    latencies = []
+    predictions = []
+    for _ in range(repeats):
+        for i in range(len(images)):
+            started = time.perf_counter()
+            output = backend.predict(images[i:i + 1])
+            latencies.append((time.perf_counter() - started) * 1000)
+            if len(predictions) < len(images):
+                predictions.append(int(np.argmax(output[0])))
+
+    batch_started = time.perf_counter()
+    backend.predict(images)
+    batch_ms_per_image = (time.perf_counter() - batch_started) * 1000 / len(images)
+
+    predictions = np.array(predictions)
+    return {
+        "backend": name,
+        "model_path": backend.model_path,
+        "images": int(len(images)),
+        "accuracy": float(np.mean(predictions == labels)),
+        "predictions": predictions.tolist(),
+        "load_seconds": round(load_seconds, 3),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        "batch_ms_per_image": round(batch_ms_per_image, 3),
+        "rss_increase_mb": round((_max_rss_bytes() - rss_before) / (1024 * 1024), 1),
+    }
+
+def evaluate(args) -> None:
+    results = []
+    for name in args.backends:
+        command = [
+            sys.executable, "-m", "inference.convert_model", "--model-path", args.model_path,
+            "_bench", "--backend", name, "--holdout-dir", args.holdout_dir, "--repeats", str(args.repeats),
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            results.append({"backend": name, "error": completed.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    # Độ khớp với Keras: tỉ lệ ảnh mà backend dự đoán cùng lớp với mô hình gốc
+    reference = next((r for r in results if r.get("backend") == "keras" and "predictions" in r), None)
+    for result in results:
+        if reference and "predictions" in result:
+            agreement = np.mean(np.array(result["predictions"]) == np.array(reference["predictions"]))
+            result["agreement_with_keras"] = float(agreement)
+            if args.min_agreement and agreement < args.min_agreement:
+                result["parity"] = "FAILED"
+        result.pop("predictions", None)
+        print(json.dumps(result))
+
+    if any(r.get("parity") == "FAILED" or "error" in r for r in results):
+        raise SystemExit(1)
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert the Keras model to TFLite or ONNX")
+    convert_parser.add_argument("--format", choices=["tflite", "onnx"], required=True)
+    convert_parser.add_argument("--quantize", choices=["none", "dynamic", "int8"], default="dynamic")
+    convert_parser.add_argument("--output")
+    convert_parser.add_argument("--calibration-dir", help="<dir>/<class_name>/ images for INT8 calibration")
+    convert_parser.add_argument("--calibration-size", type=int, default=200)
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Compare accuracy, latency and memory per backend")
+    evaluate_parser.add_argument("--holdout-dir", required=True)
+    evaluate_parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    evaluate_parser.add_argument("--repeats", type=int, default=3)
+    evaluate_parser.add_argument("--min-agreement", type=float, default=0.98,
+                                 help="Fail if a backend agrees with Keras on fewer images than this")
+
+    bench_parser = subparsers.add_parser("_bench")
+    bench_parser.add_argument("--backend", required=True)
+    bench_parser.add_argument("--holdout-dir", required=True)
+    bench_parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        convert(args)
+    elif args.command == "evaluate":
+        evaluate(args)
+    else:
+        print(json.dumps(_benchmark_backend(args.backend, args.model_path, args.holdout_dir, args.repeats)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# Tên lớp đầu ra của mô hình theo thứ tự chỉ số. Để riêng (không phụ thuộc numpy/tensorflow)
+# để phía API dùng được, ví dụ utils/flower_types.py đối chiếu với bảng FlowerTypes.
+CLASS_NAMES = ['daisy', 'dandelion', 'rose', 'sunflower', 'tulip']
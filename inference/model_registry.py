@@ -0,0 +1,86 @@
+import os
+import time
+import logging
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from inference.backends import load_backend
+from inference.labels import CLASS_NAMES
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+MODEL_PATH = os.getenv("MODEL_PATH")
+# keras | tflite | onnx (xem inference/convert_model.py để tạo file .tflite/.onnx)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras").lower()
+CONFIDENCE_THRESHOLD = 0.7
+ENTROPY_THRESHOLD = 0.5
+INPUT_SHAPE = (224, 224, 3)
+
+# Mô hình nhận diện hoa dùng chung cho toàn tiến trình, chỉ load một lần
+_model = None
+_lock = threading.Lock()
+_state = {
+    "status": "not_loaded",  # not_loaded | loading | ready | failed
+    "model_path": MODEL_PATH,
+    "backend": INFERENCE_BACKEND,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+
+def get_model():
+    """
+    Trả về backend suy luận đã load (theo INFERENCE_BACKEND); lần gọi đầu tiên
+    sẽ load và chạy thử (warm-up).
+    """
+    global _model
+    if _model is not None:
+        return _model
+
+    with _lock:
+        if _model is not None:
+            return _model
+        _state["status"] = "loading"
+        try:
+            started = time.perf_counter()
+            model = load_backend(INFERENCE_BACKEND, MODEL_PATH)
+            _state["model_path"] = model.model_path
+            _state["load_seconds"] = time.perf_counter() - started
+
+            # Chạy thử một lần để runtime khởi tạo graph/kernels trước request thật
+            started = time.perf_counter()
+            model.predict(np.zeros((1, *INPUT_SHAPE), dtype=np.float32))
+            _state["warmup_seconds"] = time.perf_counter() - started
+        except Exception as e:
+            _state["status"] = "failed"
+            _state["error"] = str(e)
+            logger.error(f"Could not load {INFERENCE_BACKEND} model from {MODEL_PATH}: {e}", exc_info=True)
+            raise
+
+        _model = model
+        _state["status"] = "ready"
+        _state["error"] = None
+        logger.info(f"Loaded {INFERENCE_BACKEND} model {model.model_path} in {_state['load_seconds']:.2f}s")
+        return _model
+
+def warm_up_in_background() -> threading.Thread:
+    """Load mô hình ở thread nền để request đầu tiên không phải chờ."""
+    def _load():
+        try:
+            get_model()
+        except Exception:
+            pass  # Lỗi đã được ghi log và lưu trong model_status()
+    thread = threading.Thread(target=_load, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def is_ready() -> bool:
+    return _model is not None
+
+def model_status() -> dict:
+    return dict(_state)
+
+def predict(batch: np.ndarray) -> np.ndarray:
+    """Chạy mô hình trên một batch ảnh đã tiền xử lý, trả về xác suất của từng lớp."""
+    return get_model().predict(batch)
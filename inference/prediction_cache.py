@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+def content_digest(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+def content_key(digest: str, namespace: str = "") -> str:
+    """Khóa cache theo SHA-256 nội dung ảnh: cùng một file upload lại sẽ cho cùng khóa."""
+    return f"prediction:{namespace}:{digest}"
+
+class MemoryPredictionCache:
+    """Cache kết quả dự đoán trong tiến trình, có TTL và loại bỏ theo LRU."""
+
+    blocking = False  # thao tác chỉ tốn micro giây, gọi thẳng trên event loop được
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+class RedisPredictionCache:
+    """
+    Cache kết quả dự đoán trên Redis (dùng chung giữa các worker), TTL do Redis quản lý.
+    Lỗi kết nối Redis chỉ làm cache miss, không làm hỏng request dự đoán.
+    """
+
+    blocking = True  # mỗi thao tác là một lượt đi-về mạng: gọi qua run_io, không chạy trên event loop
+
+    def __init__(self, url: str, ttl_seconds: float = 3600):
+        import redis
+
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            raw = self._client.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Prediction cache read failed: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: dict) -> None:
+        try:
+            self._client.setex(key, int(self.ttl_seconds), json.dumps(value))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Prediction cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+class NullPredictionCache:
+    """Tắt cache (PREDICTION_CACHE_BACKEND=none)."""
+
+    blocking = False
+
+    def get(self, key: str) -> Optional[dict]:
+        return None
+
+    def set(self, key: str, value: dict) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
+
+def create_prediction_cache():
+    backend = os.getenv("PREDICTION_CACHE_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+    if backend == "redis":
+        return RedisPredictionCache(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl_seconds)
+    if backend == "none":
+        return NullPredictionCache()
+    return MemoryPredictionCache(int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000")), ttl_seconds)
+
+prediction_cache = create_prediction_cache()
@@ -0,0 +1,102 @@
+import threading
+from typing import Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from utils.image_probe import probe_image_size
+
+TARGET_SIZE = (224, 224)
+_SCALE = np.float32(1.0 / 255.0)
+
+# Cờ giải mã JPEG ở độ phân giải giảm (libjpeg scale trong miền DCT), từ lớn tới nhỏ
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Bộ đệm uint8 trung gian cho resize/đổi màu, dùng lại theo từng thread
+_scratch = threading.local()
+
+def _decode_flag(contents: bytes, target_size: Tuple[int, int]) -> int:
+    """
+    Chọn cờ giải mã nhỏ nhất mà ảnh vẫn lớn hơn kích thước đích, để không giải mã
+    những pixel sẽ bị bỏ đi khi resize. Chỉ áp dụng cho JPEG.
+    """
+    probed = probe_image_size(contents)
+    if probed is None or probed[0] != "jpeg":
+        return cv2.IMREAD_COLOR
+    _, width, height = probed
+    for factor, flag in _REDUCED_FLAGS:
+        if width // factor >= target_size[0] and height // factor >= target_size[1]:
+            return flag
+    return cv2.IMREAD_COLOR
+
+def decode_image(contents: bytes, target_size: Tuple[int, int] = TARGET_SIZE) -> Optional[np.ndarray]:
+    """Giải mã ảnh BGR, dùng IMREAD_REDUCED_COLOR_* với JPEG lớn. Trả về None nếu không giải mã được."""
+    nparray = np.frombuffer(contents, np.uint8)
+    img = cv2.imdecode(nparray, _decode_flag(contents, target_size))
+    if img is None:
+        # Header lạ (EXIF/progressive hỏng...) -> thử lại bằng giải mã đầy đủ
+        img = cv2.imdecode(nparray, cv2.IMREAD_COLOR)
+    return img
+
+def _scratch_buffers(target_size: Tuple[int, int]):
+    shape = (target_size[1], target_size[0], 3)
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None or buffers[0].shape != shape:
+        buffers = (np.empty(shape, np.uint8), np.empty(shape, np.uint8))
+        _scratch.buffers = buffers
+    return buffers
+
+def preprocess_into(img: np.ndarray, out: np.ndarray, target_size: Tuple[int, int] = TARGET_SIZE) -> np.ndarray:
+    """
+    Resize + BGR->RGB + chuẩn hóa /255 ghi thẳng vào `out` (float32, H x W x 3),
+    ví dụ một phần tử của batch buffer cấp phát sẵn.
+    """
+    resized, rgb = _scratch_buffers(target_size)
+    # Resize trước rồi mới đổi màu: chỉ đổi màu 224x224 pixel thay vì cả ảnh gốc
+    cv2.resize(img, target_size, dst=resized, interpolation=cv2.INTER_AREA)
+    cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=rgb)
+    np.multiply(rgb, _SCALE, out=out)
+    return out
+
+def preprocess_image(img: np.ndarray, target_size=(224, 224), normalize=True) -> np.ndarray:
+    if img is None:
+        raise ValueError("Ảnh đầu vào không hợp lệ")
+
+    if not normalize:
+        img = cv2.resize(img, target_size, interpolation=cv2.INTER_AREA)
+        return np.expand_dims(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), axis=0)
+
+    out = np.empty((1, target_size[1], target_size[0], 3), dtype=np.float32)
+    preprocess_into(img, out[0], target_size)
+    return out
+
+def preprocess_bytes(contents: bytes, target_size: Tuple[int, int] = TARGET_SIZE, out: np.ndarray = None) -> Optional[np.ndarray]:
+    """
+    Giải mã (độ phân giải giảm) + tiền xử lý một ảnh từ nội dung file.
+    Trả về mảng (H, W, 3) float32 (ghi vào `out` nếu có), hoặc None nếu không giải mã được.
+    """
+    img = decode_image(contents, target_size)
+    if img is None:
+        return None
+    if out is None:
+        out = np.empty((target_size[1], target_size[0], 3), dtype=np.float32)
+    return preprocess_into(img, out, target_size)
+
+def preprocess_batch(images: Sequence, target_size: Tuple[int, int] = TARGET_SIZE, out: np.ndarray = None) -> np.ndarray:
+    """
+    Tiền xử lý nhiều ảnh (bytes hoặc mảng BGR đã giải mã) vào một batch buffer
+    (N, H, W, 3) float32. Ném ValueError nếu có ảnh không giải mã được.
+    """
+    if out is None:
+        out = np.empty((len(images), target_size[1], target_size[0], 3), dtype=np.float32)
+    for i, image in enumerate(images):
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            if preprocess_bytes(bytes(image), target_size, out[i]) is None:
+                raise ValueError(f"Không thể giải mã ảnh thứ {i} trong batch")
+        else:
+            if image is None:
+                raise ValueError("Ảnh đầu vào không hợp lệ")
+            preprocess_into(image, out[i], target_size)
+    return out[:len(images)]
@@ -0,0 +1,266 @@
+"""
+Pool tiến trình giữ mô hình, tách suy luận khỏi worker HTTP.
+
+Mỗi worker process load mô hình một lần (model_registry trong tiến trình con) và dùng
+hai vùng shared memory cố định: batch đầu vào (max_batch_size x 224 x 224 x 3 float32)
+và xác suất đầu ra. Tiến trình API ghép ảnh đã tiền xử lý thẳng vào vùng đầu vào của
+một worker rảnh, chỉ gửi số ảnh qua Pipe, rồi đọc kết quả từ vùng đầu ra; tensor không
+bị pickle hay copy qua IPC.
+
+Bật bằng INFERENCE_WORKERS=N (N > 0); mặc định 0 chạy mô hình trong tiến trình API.
+"""
+import time
+import queue
+import atexit
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import List
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DTYPE = np.float32
+
+def _worker_main(input_name: str, output_name: str, input_shape: tuple, output_shape: tuple, conn) -> None:
+    """Vòng lặp của worker process: nhận số ảnh n, chạy mô hình trên n ảnh đầu của vùng đầu vào."""
+    from inference import model_registry
+
+    shm_in = shared_memory.SharedMemory(name=input_name)
+    shm_out = shared_memory.SharedMemory(name=output_name)
+    inputs = np.ndarray(input_shape, dtype=_DTYPE, buffer=shm_in.buf)
+    outputs = np.ndarray(output_shape, dtype=_DTYPE, buffer=shm_out.buf)
+    try:
+        try:
+            model_registry.get_model()
+        except Exception as e:
+            conn.send(("failed", str(e)))
+            return
+        conn.send(("ready", model_registry.model_status()))
+
+        while True:
+            try:
+                n = conn.recv()
+            except EOFError:
+                break
+            if n is None:
+                break
+            try:
+                outputs[:n] = model_registry.predict(inputs[:n])
+                conn.send(("ok", n))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        del inputs, outputs
+        shm_in.close()
+        shm_out.close()
+
+class _Worker:
+    """Phía tiến trình API của một worker: process, Pipe và hai vùng shared memory."""
+
+    def __init__(self, index: int, context, input_shape: tuple, output_shape: tuple):
+        self.index = index
+        self.batches = 0
+        self.images = 0
+        self.busy_seconds = 0.0
+        self.closed = False
+        self._input_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(input_shape)) * np.dtype(_DTYPE).itemsize)
+        self._output_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(output_shape)) * np.dtype(_DTYPE).itemsize)
+        self.inputs = np.ndarray(input_shape, dtype=_DTYPE, buffer=self._input_shm.buf)
+        self.outputs = np.ndarray(output_shape, dtype=_DTYPE, buffer=self._output_shm.buf)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self._input_shm.name, self._output_shm.name, input_shape, output_shape, child_conn),
+            name=f"inference-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self, timeout: float) -> dict:
+        if not self.conn.poll(timeout):
+            raise RuntimeError(f"Inference worker {self.index} did not load the model within {timeout:.0f}s")
+        try:
+            status, payload = self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"Inference worker {self.index} exited with code {self.process.exitcode} while loading the model")
+        if status != "ready":
+            raise RuntimeError(f"Inference worker {self.index} failed to load the model: {payload}")
+        return payload
+
+    def run(self, images, timeout: float) -> np.ndarray:
+        n = len(images)
+        started = time.perf_counter()
+        if isinstance(images, np.ndarray):
+            self.inputs[:n] = images
+        else:
+            # Ghép batch thẳng vào shared memory, không qua buffer trung gian
+            np.stack(images, out=self.inputs[:n])
+        self.conn.send(n)
+        if not self.conn.poll(timeout):
+            # Tiến trình con bị treo: báo lỗi batch thay vì chặn thread của batcher mãi mãi
+            raise TimeoutError(f"Inference worker {self.index} did not answer within {timeout:.0f}s")
+        status, payload = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Inference worker {self.index} failed: {payload}")
+        result = self.outputs[:n].copy()
+        self.batches += 1
+        self.images += n
+        self.busy_seconds += time.perf_counter() - started
+        return result
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Dừng process và giải phóng shared memory; gọi lại nhiều lần không sao."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        del self.inputs, self.outputs
+        for shm in (self._input_shm, self._output_shm):
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+class InferenceWorkerPool:
+    """
+    Pool `num_workers` tiến trình giữ mô hình. `predict(images)` gọi được từ nhiều thread
+    (mỗi thread của InferenceBatcher giữ một worker trong lúc chạy batch).
+    Worker chết, bị treo quá `batch_timeout` giây hoặc khởi động lại thất bại được đóng và để
+    lại hàng đợi ở trạng thái closed; lần dùng tiếp theo khởi động worker mới cùng chỉ số.
+    """
+
+    def __init__(self, num_workers: int, max_batch_size: int, input_shape: tuple, num_classes: int,
+                 start_timeout: float = 300.0, batch_timeout: float = 60.0):
+        self.num_workers = max(1, num_workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.input_shape = (self.max_batch_size, *input_shape)
+        self.output_shape = (self.max_batch_size, num_classes)
+        self.start_timeout = start_timeout
+        self.batch_timeout = batch_timeout
+        # spawn: tiến trình con không thừa hưởng thread/lock của tiến trình API
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._idle = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self.status = "not_started"  # not_started | starting | ready | failed
+        self.error = None
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Khởi động mọi worker và chờ chúng load xong mô hình (gọi lại nhiều lần không sao)."""
+        if self._workers:
+            return
+        with self._start_lock:
+            if self._workers:
+                return
+            self.status = "starting"
+            workers = []
+            try:
+                # Khởi động tất cả trước rồi mới chờ để các worker load mô hình song song
+                for i in range(self.num_workers):
+                    workers.append(self._spawn(i))
+                for worker in workers:
+                    worker.wait_ready(self.start_timeout)
+            except Exception as e:
+                self.status = "failed"
+                self.error = str(e)
+                for worker in workers:
+                    worker.close(timeout=1.0)
+                raise
+            for worker in workers:
+                self._idle.put(worker)
+            self._workers = workers
+            self.status = "ready"
+            self.error = None
+            atexit.register(self.close)
+            logger.info(f"Started {self.num_workers} inference worker processes")
+
+    def start_in_background(self) -> threading.Thread:
+        def _start():
+            try:
+                self.start()
+            except Exception as e:
+                logger.error(f"Could not start inference workers: {e}", exc_info=True)
+        thread = threading.Thread(target=_start, name="inference-workers-start", daemon=True)
+        thread.start()
+        return thread
+
+    def _spawn(self, index: int) -> _Worker:
+        return _Worker(index, self._context, self.input_shape, self.output_shape)
+
+    def predict(self, images) -> np.ndarray:
+        """Chạy một batch (danh sách ảnh hoặc mảng N x H x W x 3) trên một worker rảnh."""
+        if len(images) > self.max_batch_size:
+            raise ValueError(f"Batch of {len(images)} exceeds max_batch_size={self.max_batch_size}")
+        self.start()
+        worker = self._idle.get()
+        try:
+            if worker.closed or not worker.process.is_alive():
+                worker = self._replace(worker)
+            return worker.run(images, self.batch_timeout)
+        except (EOFError, OSError, TimeoutError) as e:
+            # Pipe hỏng hoặc worker treo: vùng shared memory không còn tin được, dừng hẳn worker
+            logger.error(f"Inference worker {worker.index} failed: {e}")
+            worker.close(timeout=1.0)
+            raise RuntimeError(f"Inference worker {worker.index} failed while processing a batch: {e}")
+        finally:
+            # Worker đã đóng vẫn được trả lại hàng đợi để giữ chỗ; lần dùng sau sẽ khởi động lại
+            self._idle.put(worker)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        """Dừng worker hỏng và khởi động worker mới cùng chỉ số."""
+        worker.close(timeout=1.0)
+        replacement = self._spawn(worker.index)
+        try:
+            replacement.wait_ready(self.start_timeout)
+        except Exception:
+            replacement.close(timeout=1.0)
+            raise
+        self._workers[worker.index] = replacement
+        self.restarts += 1
+        return replacement
+
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "workers": self.num_workers,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+            "per_worker": [
+                {
+                    "index": worker.index,
+                    "pid": worker.process.pid,
+                    "alive": not worker.closed and worker.process.is_alive(),
+                    "batches": worker.batches,
+                    "images": worker.images,
+                    "busy_seconds": round(worker.busy_seconds, 3),
+                }
+                for worker in self._workers
+            ],
+        }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+        self.status = "not_started"
@@ -1,7 +1,35 @@
+import os
+import importlib
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from config.db import engine, Base
-from routers import users, flowertype, categories, products, flowers, informations
+from utils.uploads import limit_request_body
+
+# Vai trò của worker:
+#   all       - mọi endpoint trong một tiến trình (mặc định)
+#   api       - chỉ API CRUD/media; không nạp numpy/OpenCV/TensorFlow
+#   inference - chỉ /flowers/predict và /products/predict (reverse proxy định tuyến */predict tới đây)
+APP_ROLE = os.getenv("APP_ROLE", "all")
+
+# (module trong routers/, tags) theo thứ tự đăng ký
+API_ROUTERS = [
+    ("users", ["Users"]),
+    ("categories", ["Categories"]),
+    ("flowertype", ["Flower Types"]),
+    ("products", ["Products"]),
+    ("flowers", ["Flowers"]),
+    ("informations", ["Informations"]),
+    ("media", ["Media"]),
+]
+# Router predictions tự gắn tag Flowers/Products cho từng endpoint
+INFERENCE_ROUTERS = [("predictions", [])]
+COMMON_ROUTERS = [("admin", ["Admin"])]
+ROLE_ROUTERS = {
+    "all": API_ROUTERS + INFERENCE_ROUTERS + COMMON_ROUTERS,
+    "api": API_ROUTERS + COMMON_ROUTERS,
+    "inference": INFERENCE_ROUTERS + COMMON_ROUTERS,
+}
+if APP_ROLE not in ROLE_ROUTERS:
+    raise ValueError(f"Unknown APP_ROLE: {APP_ROLE}. Choose one of {sorted(ROLE_ROUTERS)}")
 
 app = FastAPI()
 
@@ -24,16 +52,32 @@ app.add_middleware(
 )
 # --- Kết thúc cấu hình CORS ---
 
-# Khởi tạo cơ sở dữ liệu
-Base.metadata.create_all(bind=engine)
+# Từ chối sớm request upload quá lớn (xem MAX_REQUEST_BYTES trong utils/uploads.py)
+app.middleware("http")(limit_request_body)
+
+# Schema được tạo/nâng cấp bằng lệnh riêng (python manage.py init-db), không chạy khi khởi động app
+
+# Đăng ký router với prefix và tags; chỉ import các router của vai trò hiện tại
+for module_name, tags in ROLE_ROUTERS[APP_ROLE]:
+    app.include_router(importlib.import_module(f"routers.{module_name}").router, tags=tags)
+
+# Load mô hình nhận diện hoa ở nền khi khởi động (MODEL_PRELOAD=0 để load ở request đầu tiên);
+# với INFERENCE_WORKERS > 0 là khởi động các worker process.
+# Worker APP_ROLE=api không bao giờ nạp mô hình.
+@app.on_event("startup")
+def preload_model():
+    if APP_ROLE != "api" and os.getenv("MODEL_PRELOAD", "1") == "1":
+        from inference.classifier import warm_up
+
+        warm_up()
+
+# Nạp bảng tra loại hoa (id/tên/thư mục/lớp của mô hình) từ bảng FlowerTypes;
+# sau đó được tự làm mới khi FlowerTypes thay đổi (utils/flower_types.py)
+@app.on_event("startup")
+def load_flower_types():
+    from utils.flower_types import flower_type_index
 
-# Đăng ký router với prefix và tags
-app.include_router(users.router, tags=["Users"])
-app.include_router(categories.router,tags=["Categories"])
-app.include_router(flowertype.router, tags=["Flower Types"])
-app.include_router(products.router, tags=["Products"])
-app.include_router(flowers.router, tags=["Flowers"])
-app.include_router(informations.router, tags=["Informations"])
+    flower_type_index.refresh(force=True)
 
 # (Optional) Route gốc để kiểm tra nhanh
 @app.get("/", tags=["Root"])
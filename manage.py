@@ -0,0 +1,79 @@
+"""
+Lệnh quản trị database (chạy một lần khi triển khai, không chạy trong worker của app).
+
+    python manage.py init-db            # alembic upgrade head
+    python manage.py init-db --create-all
+                                        # tạo bảng trực tiếp từ models rồi stamp head (dev/SQLite)
+    python manage.py stamp 0001_initial_schema
+                                        # database cũ đã có bảng: đánh dấu phiên bản hiện tại
+    python manage.py current            # phiên bản schema đang áp dụng
+    python manage.py check-indexes      # EXPLAIN các truy vấn chính
+"""
+import os
+import sys
+import argparse
+from alembic import command
+from alembic.config import Config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _alembic_config() -> Config:
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    return config
+
+def init_db(args) -> None:
+    config = _alembic_config()
+    if args.create_all:
+        from sqlalchemy import func, select
+        from sqlalchemy.orm import Session
+        from config.db import engine
+        from inference.labels import CLASS_NAMES
+        from models.models import Base, Categories, FlowerTypes, ReferenceVersions
+
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            # Giống migration 0003: mỗi bảng tham chiếu có sẵn một dòng số phiên bản cho bump_version
+            for table_name in (Categories.__tablename__, FlowerTypes.__tablename__):
+                if session.get(ReferenceVersions, table_name) is None:
+                    session.add(ReferenceVersions(TableName=table_name, Version=0))
+            # Giống migration 0004: các lớp của mô hình với id 1..5 (Daisy, Dandelion, ...)
+            if not session.scalar(select(func.count()).select_from(FlowerTypes)):
+                for flower_type_id, class_name in enumerate(CLASS_NAMES, start=1):
+                    name = class_name.capitalize()
+                    session.add(FlowerTypes(id=flower_type_id, Name=name, Description=f"{name} flowers"))
+            session.commit()
+        command.stamp(config, "head")
+    else:
+        command.upgrade(config, args.revision)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init-db", help="Create or upgrade the schema")
+    init_parser.add_argument("--revision", default="head")
+    init_parser.add_argument("--create-all", action="store_true",
+                             help="Create tables from the models and stamp head instead of running migrations")
+
+    stamp_parser = subparsers.add_parser("stamp", help="Mark the database as being at a revision")
+    stamp_parser.add_argument("revision")
+
+    subparsers.add_parser("current", help="Show the applied schema revision")
+    subparsers.add_parser("check-indexes", help="EXPLAIN the hot queries and verify index usage")
+
+    args = parser.parse_args(argv)
+    if args.command == "init-db":
+        init_db(args)
+    elif args.command == "stamp":
+        command.stamp(_alembic_config(), args.revision)
+    elif args.command == "current":
+        command.current(_alembic_config(), verbose=True)
+    else:
+        from migrations.check_indexes import main as check_indexes
+
+        return check_indexes()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Chạy EXPLAIN cho các truy vấn lọc thường gặp và kiểm tra chúng dùng index của migration 0002.
+
+    python -m migrations.check_indexes
+
+Hỗ trợ MySQL (cột `key` của EXPLAIN) và SQLite (EXPLAIN QUERY PLAN). Thoát với mã 1 nếu
+có truy vấn không dùng index mong đợi.
+"""
+import sys
+from sqlalchemy import select, text
+from config.db import engine
+from models.models import Flower, Informations, Products, SysUser, SysUserRole
+
+# (tên, câu truy vấn như trong controller, index mong đợi)
+HOT_QUERIES = [
+    ("predict: flowers by type", select(Flower).where(Flower.flower_type == "rose").order_by(Flower.id).limit(11), "ix_flowers_flower_type"),
+    ("get_flower_details", select(Flower).where(Flower.name == "rose").limit(1), "ix_flowers_name"),
+    ("auto_save_flowers: image_url lookup", select(Flower).where(Flower.image_url == "flowers/rose/a.jpg").limit(1), "ix_flowers_image_url"),
+    ("products by flower type", select(Products).where(Products.FlowerTypeID == 1).order_by(Products.id).limit(11), "ix_Products_FlowerTypeID"),
+    ("login/register: user by email", select(SysUser).where(SysUser.Email == "a@example.com").limit(1), "uq_SysUser_Email"),
+    ("information by user", select(Informations).where(Informations.UserId == 1).limit(1), "ix_Informations_UserId"),
+    ("roles by user", select(SysUserRole).where(SysUserRole.UserId == 1), "ix_SysUserRole_UserId"),
+]
+
+def _used_indexes(connection, sql: str) -> list:
+    if engine.dialect.name == "sqlite":
+        rows = connection.execute(text("EXPLAIN QUERY PLAN " + sql)).fetchall()
+        # detail dạng: "SEARCH flowers USING INDEX ix_flowers_name (name=?)"
+        # (index UNIQUE của SQLite có tên sqlite_autoindex_<bảng>_N)
+        return [row[-1] for row in rows]
+    rows = connection.execute(text("EXPLAIN " + sql)).mappings().fetchall()
+    return [row["key"] for row in rows if row["key"]]
+
+def _uses(expected: str, used: list, dialect: str) -> bool:
+    if dialect == "sqlite" and expected.startswith("uq_"):
+        table = expected.split("_")[1]
+        expected = f"sqlite_autoindex_{table}_"
+    return any(expected in detail for detail in used)
+
+def main() -> int:
+    failures = 0
+    with engine.connect() as connection:
+        for name, stmt, expected in HOT_QUERIES:
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            used = _used_indexes(connection, sql)
+            ok = _uses(expected, used, engine.dialect.name)
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {name:40} expected={expected} plan={used}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""initial schema
+
+Các bảng như trong models/models.py trước khi thêm index phụ.
+Database đã có sẵn bảng (tạo thủ công) chỉ cần: alembic stamp 0001_initial_schema
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Các model khai báo index=True trên khóa chính nên create_all tạo thêm ix_<bảng>_id
+_ID_INDEXED_TABLES = [
+    'flowers', 'FlowerTypes', 'Categories', 'Products', 'Informations', 'SysUser',
+    'SysRole', 'SysUserRole', 'Carts', 'Invoices', 'InvoiceDetails',
+]
+
+def upgrade() -> None:
+    op.create_table(
+        'flowers',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('price', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('stock_quantity', sa.Integer(), nullable=False),
+        sa.Column('image_url', sa.String(255), nullable=True),
+        sa.Column('flower_type', sa.String(255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'FlowerTypes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('Name', sa.String(255), nullable=False),
+        sa.Column('Description', sa.String(255), nullable=False),
+    )
+    op.create_table(
+        'Categories',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('Name', sa.String(255), nullable=False),
+        sa.Column('Description', sa.String(255), nullable=False),
+    )
+    op.create_table(
+        'Products',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('Name', sa.String(255), nullable=False),
+        sa.Column('Description', sa.Text(), nullable=False),
+        sa.Column('Price', sa.Integer(), nullable=False),
+        sa.Column('DiscountedPrice', sa.Integer(), nullable=False),
+        sa.Column('StockQuantity', sa.Integer()),
+        sa.Column('CategoryID', sa.Integer(), nullable=False),
+        sa.Column('ImageURL', sa.String(255), nullable=False),
+        sa.Column('IsFreeship', sa.Boolean()),
+        sa.Column('FlowerTypeID', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'Informations',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('FirstName', sa.String(128), nullable=False),
+        sa.Column('LastName', sa.String(128), nullable=False),
+        sa.Column('FullName', sa.String(256), nullable=False),
+        sa.Column('DateOfBirth', sa.Date(), nullable=False),
+        sa.Column('Gender', sa.String(32), nullable=False),
+        sa.Column('Address', sa.String(512), nullable=False),
+        sa.Column('UserId', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'SysUser',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('Email', sa.String(128), nullable=False),
+        sa.Column('Password', sa.String(1024), nullable=False),
+    )
+    op.create_table(
+        'SysRole',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('Name', sa.String(128), nullable=False),
+        sa.Column('CreateAt', sa.Date(), nullable=False),
+        sa.Column('UpdateAt', sa.Date(), nullable=False),
+    )
+    op.create_table(
+        'SysUserRole',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('UserId', sa.Integer(), nullable=False),
+        sa.Column('RoleId', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'Carts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('ProductId', sa.Integer(), nullable=False),
+        sa.Column('Quantity', sa.Integer(), nullable=False),
+        sa.Column('IsChecked', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'Invoices',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('UserId', sa.Integer(), nullable=False),
+        sa.Column('CreateAt', sa.DateTime(), nullable=False),
+        sa.Column('Price', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('Discount', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('Amount', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('Status', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'InvoiceDetails',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('ProductId', sa.Integer(), nullable=False),
+        sa.Column('InvoiceId', sa.Integer(), nullable=False),
+        sa.Column('Quantity', sa.Integer(), nullable=False),
+        sa.Column('Price', sa.DECIMAL(10, 2), nullable=False),
+    )
+    op.create_table(
+        'VnPayment',
+        sa.Column('TmnCode', sa.String(128), primary_key=True),
+        sa.Column('Amount', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('BankCode', sa.String(128), nullable=False),
+        sa.Column('BankTranNo', sa.String(128), nullable=False),
+        sa.Column('CardType', sa.String(128), nullable=False),
+        sa.Column('OrderInfo', sa.String(128), nullable=False),
+        sa.Column('PayDate', sa.String(128), nullable=False),
+        sa.Column('ResponseCode', sa.String(128), nullable=False),
+        sa.Column('TransactionNo', sa.String(128), nullable=False),
+        sa.Column('TransactionStatus', sa.String(128), nullable=False),
+        sa.Column('TxnRef', sa.String(128), nullable=False),
+    )
+    for table in _ID_INDEXED_TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'])
+    op.create_index('ix_VnPayment_TmnCode', 'VnPayment', ['TmnCode'])
+
+def downgrade() -> None:
+    for table in ['VnPayment'] + list(reversed(_ID_INDEXED_TABLES)):
+        op.drop_table(table)
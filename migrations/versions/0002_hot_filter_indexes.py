@@ -0,0 +1,51 @@
+"""secondary indexes for hot filter columns, unique SysUser.Email
+
+InnoDB lưu khóa chính trong mọi index phụ, nên index một cột (flower_type, FlowerTypeID)
+phục vụ luôn phân trang keyset "WHERE cột = ? AND id > ? ORDER BY id".
+Kiểm tra bằng EXPLAIN: python -m migrations.check_indexes
+
+Revision ID: 0002_hot_filter_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002_hot_filter_indexes'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+# (tên index, bảng, cột) - trùng tên với index=True trong models/models.py
+INDEXES = [
+    ('ix_flowers_flower_type', 'flowers', 'flower_type'),
+    ('ix_flowers_name', 'flowers', 'name'),
+    ('ix_flowers_image_url', 'flowers', 'image_url'),
+    ('ix_Products_FlowerTypeID', 'Products', 'FlowerTypeID'),
+    ('ix_Informations_UserId', 'Informations', 'UserId'),
+    ('ix_SysUserRole_UserId', 'SysUserRole', 'UserId'),
+]
+
+def _check_duplicate_emails() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT Email, COUNT(*) FROM SysUser GROUP BY Email HAVING COUNT(*) > 1'
+    )).fetchall()
+    if duplicates:
+        emails = ', '.join(row[0] for row in duplicates[:10])
+        raise RuntimeError(f'Cannot add UNIQUE(SysUser.Email): duplicated emails {emails}. Merge them first.')
+
+def upgrade() -> None:
+    # Chế độ --sql (offline) không truy vấn được dữ liệu
+    if not op.get_context().as_sql:
+        _check_duplicate_emails()
+
+    for name, table, column in INDEXES:
+        op.create_index(name, table, [column])
+    with op.batch_alter_table('SysUser') as batch_op:
+        batch_op.create_unique_constraint('uq_SysUser_Email', ['Email'])
+
+def downgrade() -> None:
+    with op.batch_alter_table('SysUser') as batch_op:
+        batch_op.drop_constraint('uq_SysUser_Email', type_='unique')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
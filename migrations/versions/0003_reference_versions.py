@@ -0,0 +1,29 @@
+"""version counters for cached reference tables
+
+Mỗi lần ghi Categories/FlowerTypes tăng ReferenceVersions.Version trong cùng transaction;
+các worker so sánh số này với bản cache trong bộ nhớ (utils/reference_cache.py).
+
+Revision ID: 0003_reference_versions
+Revises: 0002_hot_filter_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003_reference_versions'
+down_revision = '0002_hot_filter_indexes'
+branch_labels = None
+depends_on = None
+
+REFERENCE_TABLES = ['Categories', 'FlowerTypes']
+
+def upgrade() -> None:
+    reference_versions = op.create_table(
+        'ReferenceVersions',
+        sa.Column('TableName', sa.String(64), primary_key=True),
+        sa.Column('Version', sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(reference_versions, [{'TableName': name, 'Version': 0} for name in REFERENCE_TABLES])
+
+def downgrade() -> None:
+    op.drop_table('ReferenceVersions')
@@ -0,0 +1,47 @@
+"""seed FlowerTypes with the classes of the flower classifier
+
+Danh sách loại hoa (id, tên, thư mục ảnh, lớp của mô hình) giờ được đọc từ bảng FlowerTypes
+(utils/flower_types.py) thay vì các dict viết cứng. Database mới cần sẵn 5 loại hoa mà mô hình
+nhận diện, với đúng id mà các dict cũ dùng; bảng đã có dữ liệu thì giữ nguyên.
+
+Revision ID: 0004_seed_flower_types
+Revises: 0003_reference_versions
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004_seed_flower_types'
+down_revision = '0003_reference_versions'
+branch_labels = None
+depends_on = None
+
+FLOWER_TYPES = [
+    (1, 'Daisy'),
+    (2, 'Dandelion'),
+    (3, 'Rose'),
+    (4, 'Sunflower'),
+    (5, 'Tulip'),
+]
+
+flower_types = sa.table(
+    'FlowerTypes',
+    sa.column('id', sa.Integer),
+    sa.column('Name', sa.String),
+    sa.column('Description', sa.String),
+)
+
+def upgrade() -> None:
+    # Chế độ --sql (offline) không kiểm tra được bảng đã có dữ liệu hay chưa: không seed
+    if op.get_context().as_sql:
+        return
+    if op.get_bind().execute(sa.text('SELECT COUNT(*) FROM FlowerTypes')).scalar():
+        return
+    op.bulk_insert(flower_types, [
+        {'id': flower_type_id, 'Name': name, 'Description': f'{name} flowers'} for flower_type_id, name in FLOWER_TYPES
+    ])
+    op.execute("UPDATE ReferenceVersions SET Version = Version + 1 WHERE TableName = 'FlowerTypes'")
+
+def downgrade() -> None:
+    # Dữ liệu seed có thể đã được sản phẩm tham chiếu: không xóa
+    pass
@@ -1,20 +1,18 @@
 from sqlalchemy import Date, DateTime, Column, Text, DECIMAL, func, Boolean
 # from sqlalchemy.types import Integer,String
-from config.db import meta
-from sqlalchemy import Column, Integer, String
-from sqlalchemy.ext.declarative import declarative_base
+from config.db import Base
+from sqlalchemy import Column, Integer, String, UniqueConstraint
 
-Base = declarative_base()
 class Flower(Base):
     __tablename__ = 'flowers'
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     price = Column(DECIMAL(10, 2), nullable=False)
     stock_quantity = Column(Integer, nullable=False, default=0)
     # image_url sẽ lưu đường dẫn tương đối tới file trên server, ví dụ: /media/flower_images/abc.jpg
-    image_url = Column(String(255), nullable=True)
-    flower_type = Column(String(255), nullable=True)
+    image_url = Column(String(255), nullable=True, index=True)
+    flower_type = Column(String(255), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
@@ -30,6 +28,13 @@ class Categories(Base):
     Name = Column(String(255), nullable = False)
     Description  = Column(String(255), nullable = False)
 
+class ReferenceVersions(Base):
+    # Số phiên bản của từng bảng dữ liệu tham chiếu (Categories, FlowerTypes), tăng mỗi lần ghi;
+    # mọi worker so sánh với bản đã cache để biết khi nào cần đọc lại (utils/reference_cache.py)
+    __tablename__ = 'ReferenceVersions'
+    TableName = Column(String(64), primary_key=True)
+    Version = Column(Integer, nullable=False, default=0)
+
 class Products(Base):
     __tablename__ = 'Products'
     id = Column(Integer, primary_key=True, index=True)
@@ -41,7 +46,7 @@ class Products(Base):
     CategoryID = Column(Integer, nullable=False)
     ImageURL = Column(String(255), nullable=False)
     IsFreeship = Column(Boolean, default=False)
-    FlowerTypeID = Column(Integer, nullable=False)
+    FlowerTypeID = Column(Integer, nullable=False, index=True)
 
 class Informations(Base):
     __tablename__ = 'Informations'
@@ -52,10 +57,11 @@ class Informations(Base):
     DateOfBirth = Column(Date, nullable=False)
     Gender = Column(String(32), nullable=False)
     Address = Column(String(512), nullable=False)
-    UserId = Column(Integer, nullable=False)
+    UserId = Column(Integer, nullable=False, index=True)
 
 class SysUser(Base):
     __tablename__ = 'SysUser'
+    __table_args__ = (UniqueConstraint('Email', name='uq_SysUser_Email'),)
     id = Column(Integer, primary_key=True, index=True)
     Email = Column(String(128), nullable=False)
     Password = Column(String(1024), nullable=False)
@@ -70,7 +76,7 @@ class SysRole(Base):
 class SysUserRole(Base):
     __tablename__ = "SysUserRole"
     id = Column(Integer, primary_key=True, index=True)
-    UserId = Column(Integer, nullable=False)
+    UserId = Column(Integer, nullable=False, index=True)
     RoleId = Column(Integer, nullable=False)
 
 class Carts(Base):
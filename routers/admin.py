@@ -0,0 +1,68 @@
+import os
+from fastapi import APIRouter, Depends
+from utils.image_cache import image_cache
+from utils.executors import pool_stats, run_io
+from config import db
+from auth.authentication import auth_stats, require_admin
+from globals import sessions
+
+# Mọi endpoint quản trị cần header X-Admin-Token (xem ADMIN_TOKEN trong auth/authentication.py)
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+# Cùng biến môi trường với main.APP_ROLE: worker "api" không được nạp numpy/OpenCV/mô hình,
+# kể cả khi có người gọi các endpoint thống kê suy luận
+APP_ROLE = os.getenv("APP_ROLE", "all")
+NOT_SERVED = {"status": "not served in this role"}
+
+@router.get("/image-cache", summary="Base64 image cache statistics")
+def read_image_cache_stats():
+    return image_cache.stats()
+
+@router.get("/model", summary="Flower classifier readiness")
+def read_model_status():
+    if APP_ROLE == "api":
+        return NOT_SERVED
+    from inference.classifier import inference_status
+
+    return inference_status()
+
+@router.get("/inference", summary="Micro-batching inference statistics")
+def read_inference_stats():
+    if APP_ROLE == "api":
+        return NOT_SERVED
+    from inference.classifier import batcher, worker_pool
+    from inference.prediction_cache import prediction_cache
+
+    return {
+        "batcher": batcher.stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "workers": worker_pool.stats() if worker_pool is not None else None,
+    }
+
+@router.get("/sessions", summary="Authentication mode and session store statistics")
+def read_session_stats():
+    return auth_stats(sessions)
+
+@router.get("/reference-cache", summary="Cached reference tables (Categories, FlowerTypes)")
+def read_reference_cache_stats():
+    from controller.categories import categories_cache
+    from controller.flowertype import flower_types_cache
+
+    from utils.flower_types import flower_type_index
+
+    return {
+        "tables": [categories_cache.stats(), flower_types_cache.stats()],
+        "flower_type_index": flower_type_index.stats(),
+    }
+
+@router.get("/executors", summary="Thread pool queue depth and throughput")
+def read_executor_stats():
+    return pool_stats()
+
+@router.get("/db-pool", summary="Database connection pool checkout/overflow/wait statistics")
+def read_db_pool_stats():
+    return {**db.pool_stats(), "async": db.async_pool_stats()}
+
+@router.get("/db-health", summary="Database connectivity check")
+async def read_db_health():
+    return {**await run_io(db.check_database), "pool": db.pool_stats()}
@@ -0,0 +1,116 @@
+import os
+import re
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from utils.image_variants import DEFAULT_FORMAT, generate_variant
+from utils.media import media_path
+
+router = APIRouter(prefix="/media")
+
+CHUNK_SIZE = 64 * 1024
+CACHE_CONTROL = "public, max-age=3600"
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _resolve_media_path(file_path: str) -> str:
+    """Chuyển đường dẫn trong URL thành file thật, chặn truy cập ra ngoài MEDIA_ROOT."""
+    absolute_path = media_path(file_path)
+    if absolute_path is None or not os.path.isfile(absolute_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    return absolute_path
+
+def _is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _parse_range(range_header: str, file_size: int) -> Optional[tuple]:
+    """Phân tích header Range một đoạn (bytes=start-end). Trả về (start, end) hoặc None nếu không hợp lệ."""
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if start == "":
+        # bytes=-N: N byte cuối file
+        length = int(end)
+        if length == 0:
+            return None
+        return max(file_size - length, 0), file_size - 1
+    start = int(start)
+    end = int(end) if end else file_size - 1
+    if start >= file_size or start > end:
+        return None
+    return start, min(end, file_size - 1)
+
+def _iter_file_range(absolute_path: str, start: int, end: int):
+    with open(absolute_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"], summary="Serve a media file")
+def serve_media(
+    file_path: str,
+    request: Request,
+    variant: Optional[str] = None,
+    fmt: str = Query(DEFAULT_FORMAT, alias="format")
+):
+    """
+    Phục vụ file trong MEDIA_ROOT với ETag/Last-Modified (trả 304 khi client đã có bản mới nhất)
+    và hỗ trợ header Range (206). Toàn bộ file được gửi bằng FileResponse, dùng
+    extension `http.response.pathsend` (sendfile) khi ASGI server hỗ trợ.
+
+    `?variant=thumb|medium&format=jpg|webp` trả về bản thu nhỏ, được sinh lần đầu
+    khi có request rồi lưu cache trên đĩa.
+    """
+    absolute_path = _resolve_media_path(file_path)
+    if variant is not None:
+        try:
+            absolute_path = generate_variant(absolute_path, variant, fmt)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if absolute_path is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image variant not available")
+    stat_result = os.stat(absolute_path)
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if _is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) in (etag, headers["Last-Modified"]):
+        byte_range = _parse_range(range_header, stat_result.st_size)
+        if byte_range is None:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{stat_result.st_size}"}
+            )
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        body = _iter_file_range(absolute_path, start, end) if request.method == "GET" else iter(())
+        media_type = mimetypes.guess_type(absolute_path)[0] or "application/octet-stream"
+        return StreamingResponse(body, status_code=status.HTTP_206_PARTIAL_CONTENT, headers=headers, media_type=media_type)
+
+    return FileResponse(absolute_path, headers=headers, stat_result=stat_result)
@@ -0,0 +1,140 @@
+"""
+Các endpoint nhận diện hoa (đường dẫn giữ nguyên: /flowers/predict, /products/predict).
+
+Tách khỏi routers/flowers.py và routers/products.py để worker APP_ROLE=api không phải
+nạp numpy/OpenCV/TensorFlow; xem main.py.
+"""
+import logging
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+import controller.flowers as crud
+from config.db import get_db
+from controller.products import get_products_page as get_products_page_controller
+from utils.executors import run_io
+from utils.flower_types import flower_type_index
+from utils.media import flower_to_dict, product_to_dict
+from utils.uploads import read_upload
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+async def _classify_upload(file: UploadFile) -> dict:
+    # Import khi có request đầu tiên: module inference kéo theo numpy/OpenCV và mô hình
+    from inference.classifier import classify_image
+
+    # Đọc file theo từng chunk, giới hạn dung lượng/kích thước ảnh và băm nội dung trong lúc đọc
+    contents, content_hash = await read_upload(file)
+    return await classify_image(contents, content_hash)
+
+@router.post("/flowers/predict", response_model=Dict, tags=["Flowers"])
+async def predict_flower(
+    file: UploadFile = File(...),
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    inline_images: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Dự đoán loài hoa từ ảnh được tải lên và lấy dữ liệu liên quan với phân trang.
+    """
+    try:
+        # Đọc nội dung file và nhận diện loài hoa
+        prediction = await _classify_upload(file)
+        confidence = prediction["confidence"]
+
+        # Lấy tên loài hoa dự đoán
+        flower_name = prediction["flower_name"]
+
+        # Phân trang dữ liệu trong SQL, chỉ chuyển đổi các hoa của trang hiện tại.
+        # Truy vấn đồng bộ + đọc ảnh chạy trong pool I/O để không chặn event loop.
+        def load_related_flowers():
+            result = crud.get_flowers_page(
+                db, page=page, per_page=per_page, cursor=cursor, flower_type=flower_name
+            )
+            return result, [flower_to_dict(flower, inline_images) for flower in result["data"]]
+
+        paginated_result, flowers_data = await run_io(load_related_flowers)
+
+        # Tạo response
+        response = {
+            "flower_name": flower_name,
+            "confidence": confidence,  # Độ tin cậy của dự đoán
+            "related_flowers": flowers_data,  # Danh sách hoa liên quan
+            "total_records": paginated_result["total_record"],
+            "page": paginated_result["page"],
+            "per_page": paginated_result["per_page"],
+            "next_cursor": paginated_result["next_cursor"]
+        }
+        return response
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in /predict: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Lỗi server: {str(e)}")
+
+@router.post("/products/predict", tags=["Products"], summary="Predict flower type and get related products")
+async def predict_product(
+    file: UploadFile = File(...),
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    inline_images: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Dự đoán loài hoa từ ảnh được tải lên và lấy danh sách sản phẩm liên quan với phân trang.
+    """
+    try:
+        # Đọc nội dung file và nhận diện loài hoa
+        prediction = await _classify_upload(file)
+        confidence = prediction["confidence"]
+
+        # Lấy tên loài hoa dự đoán
+        flower_name = prediction["flower_name"]
+        print(f"Predicted flower name: {flower_name}")
+
+        # Map tên loài hoa với FlowerTypeID (bảng tra có thể phải đọc lại FlowerTypes -> chạy trong pool I/O)
+        flower_type = await run_io(flower_type_index.by_name, flower_name)
+        if flower_type is None:
+            raise HTTPException(status_code=400, detail=f"Loài hoa '{flower_name}' không nằm trong danh sách hỗ trợ")
+        flower_type_id = flower_type.id
+        print(f"Mapped FlowerTypeID: {flower_type_id}")
+
+        # Lấy danh sách sản phẩm liên quan dựa trên FlowerTypeID, phân trang trong SQL.
+        # Truy vấn đồng bộ + đọc ảnh chạy trong pool I/O để không chặn event loop.
+        def load_related_products():
+            result = get_products_page_controller(
+                db, page=page, per_page=per_page, cursor=cursor, flower_type_id=flower_type_id
+            )
+            return result, [product_to_dict(product, inline_images) for product in result["data"]]
+
+        paginated_result, products_data = await run_io(load_related_products)
+        print(f"Number of products found for FlowerTypeID {flower_type_id}: {paginated_result['total_record']}")
+
+        if paginated_result["total_record"] == 0:
+            raise HTTPException(status_code=404, detail=f"Không tìm thấy sản phẩm nào cho loại hoa '{flower_name}'")
+
+        # Tạo response
+        response = {
+            "flower_name": flower_name,
+            "confidence": confidence,  # Độ tin cậy của dự đoán
+            "related_products": products_data,  # Danh sách sản phẩm liên quan
+            "total_records": paginated_result["total_record"],
+            "page": paginated_result["page"],
+            "per_page": paginated_result["per_page"],
+            "next_cursor": paginated_result["next_cursor"]
+        }
+        return response
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Lỗi server: {str(e)}")
@@ -1,34 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
-import uuid
-from sqlalchemy.orm import Session
-from config.db import get_db
-from models.models import SysUser
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import get_async_db
 from schemas.users import UserAuth
-from controller.users import create_user, authenticate_user
+from controller.users import create_user, authenticate_user, get_user_by_email
+from auth.authentication import create_credential, revoke_credential
 from globals import sessions, api_key_header
+from utils.executors import run_io
 
 router = APIRouter(
     prefix="/users"
 )
 
 @router.post("/register")
-async def create_user_endpoint(user: UserAuth, db: Session = Depends(get_db)):
-    user_exists = db.query(SysUser).filter(SysUser.Email == user.email).first()
+async def create_user_endpoint(user: UserAuth, db: AsyncSession = Depends(get_async_db)):
+    user_exists = await get_user_by_email(db, user.email)
     if user_exists:
         raise HTTPException(status_code=400, detail="Email is existed")
-    db_user = create_user(db, user=user)
+    try:
+        db_user = await create_user(db, user=user)
+    except IntegrityError:
+        # Hai request cùng email vượt qua kiểm tra ở trên trong lúc đang băm mật khẩu: uq_SysUser_Email chặn bản thứ hai
+        await db.rollback()
+        db_user = None
     if db_user is None:
         raise HTTPException(status_code=400, detail="User already registered")
     return {"Message": "Register Successfully"}
 
 @router.post("/login")
-async def login(user: UserAuth, db: Session = Depends(get_db)):
-    db_user = authenticate_user(db, user=user)
+async def login(user: UserAuth, db: AsyncSession = Depends(get_async_db)):
+    db_user = await authenticate_user(db, user=user)
     if db_user is None:
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    session_id = str(uuid.uuid4()).replace("-", "")
-    sessions[session_id] = db_user.id
+    # Store sqlite/redis ghi bằng I/O chặn: chạy trong pool I/O để không chặn event loop
+    if sessions.blocking:
+        session_id = await run_io(create_credential, sessions, db_user.id)
+    else:
+        session_id = create_credential(sessions, db_user.id)
     response = JSONResponse(content={"session_id": session_id, "isSuccess": True, "message": "Login successful"})
     response.headers["Authorization"] = session_id
     return response
@@ -37,9 +46,14 @@ async def login(user: UserAuth, db: Session = Depends(get_db)):
 async def logout(
         session_id: str = Depends(api_key_header)
     ):
-    if session_id is None or session_id not in sessions:
+    if session_id is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if sessions.blocking:
+        revoked = await run_io(revoke_credential, sessions, session_id)
+    else:
+        revoked = revoke_credential(sessions, session_id)
+    if not revoked:
         raise HTTPException(status_code=401, detail="Unauthorized")
-    del sessions[session_id]
     response = JSONResponse(content={"message": "Logout successful"})
     response.headers["Authorization"] = ""
     return response
\ No newline at end of file
@@ -7,7 +7,7 @@ class FlowerBase(BaseModel):
     description: Optional[str] = None
     price: Decimal = Field(..., gt=0, decimal_places=2)
     stock_quantity: int = Field(..., ge=0)
-    flower_type: str = Field(..., pattern="^(daisy|dandelion|rose|sunflower|tulip)$")  # Chỉ nhận các giá trị hợp lệ
+    flower_type: str = Field(..., min_length=1, max_length=255)  # Giá trị hợp lệ lấy từ bảng FlowerTypes, kiểm tra ở routers/flowers.py
 
 class FlowerCreate(FlowerBase):
     pass
@@ -17,11 +17,14 @@ class FlowerUpdate(BaseModel):
     description: Optional[str] = None
     price: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
     stock_quantity: Optional[int] = Field(None, ge=0)
-    flower_type: Optional[str] = Field(None, pattern="^(daisy|dandelion|rose|sunflower|tulip)$")
+    flower_type: Optional[str] = Field(None, min_length=1, max_length=255)
 
 class Flower(FlowerBase):
     id: int
     image_url: Optional[str] = None
+    media_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    image_base64: Optional[str] = None  # Chỉ có khi gọi với inline_images=true
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -24,5 +24,4 @@ class ResponseInformation(BaseModel):
     gender: str
     address: str
     user_id: int
-    email: str
-    password: str
\ No newline at end of file
+    email: str
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+class InstrumentedExecutor:
+    """
+    ThreadPoolExecutor có đếm số việc đang chờ/đang chạy, dùng để đẩy việc blocking
+    (giải mã ảnh, truy vấn DB đồng bộ, đọc file) ra khỏi event loop.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        return self._executor.submit(self._call, fn, args, kwargs)
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+        return result
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Chạy `fn` trong pool và chờ kết quả mà không chặn event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+# Pool cho việc nặng CPU (OpenCV/NumPy nhả GIL nên thread là đủ)
+cpu_pool = InstrumentedExecutor("cpu", int(os.getenv("CPU_POOL_SIZE", str(os.cpu_count() or 1))))
+# Pool cho I/O blocking (SQLAlchemy đồng bộ, đọc/ghi file)
+io_pool = InstrumentedExecutor("io", int(os.getenv("IO_POOL_SIZE", "32")))
+# Pool riêng cho băm mật khẩu (auth/passwords.py): mỗi lần băm scrypt chiếm CPU và bộ nhớ,
+# giới hạn riêng để đăng nhập dồn dập không chiếm hết cpu_pool của xử lý ảnh
+password_pool = InstrumentedExecutor("password", int(os.getenv("PASSWORD_POOL_SIZE", str(os.cpu_count() or 1))))
+
+async def run_cpu(fn: Callable, *args, **kwargs):
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+async def run_io(fn: Callable, *args, **kwargs):
+    return await io_pool.run(fn, *args, **kwargs)
+
+def pool_stats() -> dict:
+    return {pool.name: pool.stats() for pool in (cpu_pool, io_pool, password_pool)}
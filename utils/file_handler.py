@@ -1,9 +1,12 @@
 import os
-import shutil
 from uuid import uuid4
 from fastapi import UploadFile, HTTPException
 import logging
-from config.db import FLOWER_TYPE_DIRS, MEDIA_ROOT
+from utils.flower_types import flower_type_index
+from utils.image_variants import generate_all_variants, delete_variants
+from utils.image_cache import image_cache
+from utils.media import media_path
+from utils.uploads import save_upload
 
 logger = logging.getLogger(__name__)
 
@@ -15,21 +18,25 @@ def save_image(upload_file: UploadFile, flower_type: str) -> str:
     Lưu file ảnh vào thư mục tương ứng với loại hoa.
     Trả về đường dẫn tương đối của file đã lưu.
     """
-    if flower_type not in FLOWER_TYPE_DIRS:
+    known_type = flower_type_index.by_name(flower_type)
+    if known_type is None:
         raise HTTPException(status_code=400, detail=f"Invalid flower type: {flower_type}")
 
-    flower_dir = FLOWER_TYPE_DIRS[flower_type]
-
     ext = os.path.splitext(upload_file.filename)[1]
     unique_filename = f"{uuid4()}{ext}"
-    relative_path = os.path.join("flowers", flower_type, unique_filename)
-    absolute_path = os.path.join(flower_dir, unique_filename)
+    relative_path = os.path.join("flowers", known_type.key, unique_filename)
+    absolute_path = media_path(relative_path)
+    if absolute_path is None:
+        raise HTTPException(status_code=400, detail="Invalid image file name")
 
     try:
-        # Lưu file
-        with open(absolute_path, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
+        # Lưu file theo từng chunk, giới hạn dung lượng và kích thước ảnh
+        save_upload(upload_file.file, absolute_path)
+        # Tạo sẵn ảnh thu nhỏ/WebP cho các trang danh sách
+        generate_all_variants(absolute_path)
         return relative_path
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving image: {e}")
         raise HTTPException(status_code=500, detail="Could not save image file")
@@ -40,10 +47,15 @@ def delete_image(relative_path: str):
     """Xóa file ảnh dựa vào đường dẫn tương đối."""
     if not relative_path:
         return
-    absolute_path = os.path.join(MEDIA_ROOT, relative_path)
+    absolute_path = media_path(relative_path)
+    if absolute_path is None:
+        logger.warning(f"Refusing to delete image outside MEDIA_ROOT: {relative_path}")
+        return
+    image_cache.invalidate(absolute_path)
     if os.path.isfile(absolute_path):
         try:
             os.remove(absolute_path)
+            delete_variants(absolute_path)
             logger.info(f"Deleted image file: {absolute_path}")
         except Exception as e:
             logger.error(f"Error deleting image file {absolute_path}: {e}")
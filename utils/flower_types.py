@@ -0,0 +1,163 @@
+import os
+import re
+import time
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from config.db import FLOWER_IMAGE_DIR_ABSOLUTE, PRODUCT_IMAGE_DIR_ABSOLUTE, SessionLocal
+from inference.labels import CLASS_NAMES
+from models.models import FlowerTypes, ReferenceVersions
+from utils.reference_cache import REFERENCE_CACHE_CHECK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class FlowerType(NamedTuple):
+    id: int
+    name: str  # tên hiển thị trong bảng FlowerTypes, ví dụ "Daisy"
+    key: str  # tên viết thường: giá trị flowers.flower_type, tên thư mục ảnh và tên lớp của mô hình
+    flower_dir: str  # media/flowers/<key>
+    product_dir: str  # media/flowers/flowers_shop/<key>
+
+# Khóa được dùng làm tên thư mục dưới media/flowers: chỉ chữ thường, số, "_" và "-"
+FLOWER_TYPE_KEY_RE = re.compile(r"^[a-z0-9_-]+$")
+
+def flower_type_key(name: str) -> str:
+    return name.strip().lower()
+
+def is_valid_flower_type_name(name: Optional[str]) -> bool:
+    """Tên loại hoa dùng được làm thư mục ảnh (không có "/", "..", khoảng trắng...)."""
+    return bool(name) and FLOWER_TYPE_KEY_RE.match(flower_type_key(name)) is not None
+
+class FlowerTypeIndex:
+    """
+    Bảng tra loại hoa id <-> tên <-> thư mục <-> lớp của mô hình, dựng từ bảng FlowerTypes.
+
+    Mỗi lần dựng lại tạo dict mới rồi mới gán thay dict cũ nên các thread đọc không cần khóa.
+    Tra cứu kiểm tra số phiên bản FlowerTypes trong ReferenceVersions tối đa mỗi `check_seconds`
+    giây (giống ReferenceCache) và dựng lại khi khác, nên loại hoa mới thêm ở worker khác
+    dùng được sau tối đa `check_seconds` giây mà không cần deploy lại.
+    Các hàm tra cứu chạy truy vấn đồng bộ: chỉ gọi từ endpoint đồng bộ hoặc trong run_io.
+
+    Tên lớp của mô hình và tên thư mục ảnh được suy ra từ cột Name nên mỗi lần dựng lại đều
+    đối chiếu với CLASS_NAMES và các thư mục trong media/flowers, ghi cảnh báo khi lệch.
+    """
+
+    def __init__(self, session_factory=SessionLocal, check_seconds: float = REFERENCE_CACHE_CHECK_SECONDS):
+        self._session_factory = session_factory
+        self.check_seconds = check_seconds
+        self._by_id: Dict[int, FlowerType] = {}
+        self._by_key: Dict[str, FlowerType] = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self.missing_classes: List[str] = []
+        self.loads = 0
+        self.errors = 0
+
+    def rebuild(self, rows, version: Optional[int] = None) -> None:
+        by_id, by_key = {}, {}
+        for row in rows:
+            if not is_valid_flower_type_name(row["Name"]):
+                # Dòng cũ có tên không an toàn làm đường dẫn: bỏ qua thay vì tạo thư mục từ nó
+                logger.warning(f"Skipping flower type {row['id']} with invalid name {row['Name']!r}")
+                continue
+            key = flower_type_key(row["Name"])
+            entry = FlowerType(
+                id=row["id"],
+                name=row["Name"],
+                key=key,
+                flower_dir=os.path.join(FLOWER_IMAGE_DIR_ABSOLUTE, key),
+                product_dir=os.path.join(PRODUCT_IMAGE_DIR_ABSOLUTE, key),
+            )
+            by_id[entry.id] = entry
+            if key in by_key:
+                logger.warning(f"Flower types {by_key[key].id} and {entry.id} share the name '{key}'; lookups by name use {by_key[key].id}")
+            by_key.setdefault(key, entry)
+        self._check_names(by_key)
+        for entry in by_id.values():
+            os.makedirs(entry.flower_dir, exist_ok=True)
+        self._by_id, self._by_key = by_id, by_key
+        self._version = version
+        self.loads += 1
+
+    def _check_names(self, by_key: Dict[str, FlowerType]) -> None:
+        # Lớp không có dòng FlowerTypes: dự đoán lớp đó không tìm được sản phẩm nào
+        self.missing_classes = [name for name in CLASS_NAMES if name not in by_key]
+        if self.missing_classes:
+            logger.warning(f"Model classes without a FlowerTypes row: {self.missing_classes}")
+        unknown = sorted(set(by_key) - set(CLASS_NAMES))
+        if unknown:
+            logger.info(f"Flower types the model cannot predict: {unknown}")
+        # Thư mục ảnh không ứng với loại nào, thường do đổi Name trong DB (ví dụ "Roses" thay cho "rose")
+        if os.path.isdir(FLOWER_IMAGE_DIR_ABSOLUTE):
+            orphans = sorted(
+                name for name in os.listdir(FLOWER_IMAGE_DIR_ABSOLUTE)
+                if name not in by_key
+                and os.path.join(FLOWER_IMAGE_DIR_ABSOLUTE, name) != PRODUCT_IMAGE_DIR_ABSOLUTE
+                and os.path.isdir(os.path.join(FLOWER_IMAGE_DIR_ABSOLUTE, name))
+            )
+            if orphans:
+                logger.warning(f"Image folders under {FLOWER_IMAGE_DIR_ABSOLUTE} without a FlowerTypes row: {orphans}")
+
+    def _load(self, db: Session, force: bool) -> None:
+        version = db.scalar(
+            select(ReferenceVersions.Version).where(ReferenceVersions.TableName == FlowerTypes.__tablename__)
+        ) or 0
+        if force or version != self._version or not self._by_id:
+            rows = db.execute(select(FlowerTypes.id, FlowerTypes.Name).order_by(FlowerTypes.id)).mappings().all()
+            self.rebuild(rows, version)
+
+    def refresh(self, db: Optional[Session] = None, force: bool = False) -> None:
+        """Dựng lại nếu số phiên bản trong DB đã đổi (hoặc luôn dựng lại với `force`)."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_seconds:
+            return
+        with self._refresh_lock:
+            if not force and now - self._checked_at < self.check_seconds:
+                return
+            try:
+                if db is not None:
+                    self._load(db, force)
+                else:
+                    with self._session_factory() as session:
+                        self._load(session, force)
+            except Exception as e:
+                # DB không truy cập được: giữ snapshot cũ, thử lại sau check_seconds
+                self.errors += 1
+                logger.error(f"Could not load flower types: {e}")
+            self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Gọi sau khi ghi FlowerTypes trong worker này: lần tra tiếp theo kiểm tra lại ngay."""
+        self._checked_at = 0.0
+
+    def get(self, flower_type_id: Optional[int]) -> Optional[FlowerType]:
+        if flower_type_id is None:
+            return None
+        self.refresh()
+        return self._by_id.get(flower_type_id)
+
+    def by_name(self, name: Optional[str]) -> Optional[FlowerType]:
+        """Tra theo tên (không phân biệt hoa thường), tên thư mục hoặc tên lớp dự đoán của mô hình."""
+        if not name:
+            return None
+        self.refresh()
+        return self._by_key.get(flower_type_key(name))
+
+    def all(self) -> List[FlowerType]:
+        self.refresh()
+        return list(self._by_id.values())
+
+    def stats(self) -> dict:
+        return {
+            "flower_types": {entry.id: entry.key for entry in self._by_id.values()},
+            "missing_classes": self.missing_classes,
+            "version": self._version,
+            "check_seconds": self.check_seconds,
+            "loads": self.loads,
+            "errors": self.errors,
+        }
+
+flower_type_index = FlowerTypeIndex()
@@ -0,0 +1,83 @@
+import os
+import base64
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+class ImageCache:
+    """
+    Cache LRU trong tiến trình cho ảnh đã mã hóa Base64, giới hạn theo tổng số byte.
+    Khóa là đường dẫn file; mỗi entry ghi kèm (mtime, size) nên file bị ghi đè
+    sẽ tự động bị đọc lại.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, encoded)
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_base64(self, path: str) -> Optional[str]:
+        path = os.path.abspath(path)
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+        version = (stat_result.st_mtime_ns, stat_result.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == version:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # Đọc file ngoài khóa để các request khác không phải chờ I/O
+        with open(path, "rb") as image_file:
+            encoded = base64.b64encode(image_file.read()).decode("utf-8")
+
+        if len(encoded) <= self.max_bytes:
+            with self._lock:
+                self._remove(path)
+                self._entries[path] = (version[0], version[1], encoded)
+                self._current_bytes += len(encoded)
+                while self._current_bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._current_bytes -= len(evicted)
+                    self.evictions += 1
+        return encoded
+
+    def _remove(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._current_bytes -= len(entry[2])
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._remove(os.path.abspath(path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+# Cache dùng chung cho toàn tiến trình (mặc định 64 MB)
+image_cache = ImageCache(int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
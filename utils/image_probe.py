@@ -0,0 +1,108 @@
+import struct
+from typing import Optional, Tuple
+
+# Không phụ thuộc numpy/OpenCV: dùng được khi kiểm tra upload ở worker chỉ phục vụ API
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class ImageSizeProbe:
+    """
+    Đọc (định dạng, rộng, cao) từ header JPEG/PNG theo từng chunk, không giải mã ảnh.
+
+    Với JPEG chỉ giữ lại vài byte marker/độ dài của segment đang đọc dở; nội dung các segment
+    trước SOF (EXIF, XMP mở rộng... có thể vài trăm KB) được bỏ qua theo độ dài khai báo nên
+    không cần giữ trong bộ nhớ. `result` có giá trị khi đọc được kích thước, `failed` là True
+    khi dữ liệu không phải JPEG/PNG hợp lệ.
+    """
+
+    def __init__(self):
+        self.result: Optional[Tuple[str, int, int]] = None
+        self.failed = False
+        self._format = None
+        self._pending = b""  # phần đầu marker/header chưa đủ byte để phân tích
+        self._skip = 0  # số byte nội dung segment còn phải bỏ qua
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None or self.failed
+
+    def feed(self, chunk) -> None:
+        if self.done:
+            return
+        if self._skip:
+            if len(chunk) <= self._skip:
+                self._skip -= len(chunk)
+                return
+            chunk = chunk[self._skip:]
+            self._skip = 0
+        data = self._pending + bytes(chunk) if self._pending else chunk
+        offset = self._parse(data)
+        self._pending = b"" if self.done else bytes(data[offset:])
+
+    def _parse(self, data) -> int:
+        """Phân tích `data`, trả về vị trí byte đầu tiên chưa dùng tới."""
+        offset = 0
+        if self._format is None:
+            if data[:8] == _PNG_SIGNATURE:
+                self._format = "png"
+            elif data[:2] == b"\xff\xd8":
+                self._format = "jpeg"
+                offset = 2
+            elif len(data) < 8 and (_PNG_SIGNATURE.startswith(data) or data == b"\xff"):
+                return 0
+            else:
+                self.failed = True
+                return 0
+
+        if self._format == "png":
+            if len(data) >= 24:
+                width, height = struct.unpack(">II", data[16:24])
+                self.result = ("png", width, height)
+            return 0
+        return self._parse_jpeg(data, offset)
+
+    def _parse_jpeg(self, data, offset: int) -> int:
+        length = len(data)
+        while offset + 2 <= length:
+            if data[offset] != 0xFF:
+                self.failed = True
+                return offset
+            marker = data[offset + 1]
+            if marker == 0xFF:  # byte đệm
+                offset += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                offset += 2
+                continue
+            if marker in (0xD9, 0xDA):
+                # Hết ảnh hoặc đã tới dữ liệu nén mà chưa gặp SOF
+                self.failed = True
+                return offset
+            if offset + 4 > length:
+                break
+            segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+            if segment_length < 2:
+                self.failed = True
+                return offset
+            if marker in _JPEG_SOF_MARKERS:
+                if offset + 9 > length:
+                    break
+                height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+                self.result = ("jpeg", width, height)
+                return offset + 9
+            end = offset + 2 + segment_length
+            if end > length:
+                # Segment kéo sang chunk sau: bỏ qua phần còn lại khi nó tới
+                self._skip = end - length
+                return length
+            offset = end
+        return offset
+
+def probe_image_size(contents: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    Đọc (định dạng, rộng, cao) từ header JPEG/PNG mà không giải mã ảnh.
+    Trả về None nếu không nhận ra định dạng.
+    """
+    probe = ImageSizeProbe()
+    probe.feed(contents)
+    return probe.result
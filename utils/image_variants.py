@@ -0,0 +1,102 @@
+import os
+import logging
+from typing import Optional
+from uuid import uuid4
+from config.db import MEDIA_ROOT, VARIANT_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Kích thước cạnh dài nhất (px) của từng biến thể ảnh
+VARIANT_SIZES = {
+    "thumb": 256,
+    "medium": 800,
+}
+# Định dạng đầu ra và tham số nén tương ứng (tên hằng số OpenCV, chất lượng).
+# cv2 chỉ được import khi thật sự tạo biến thể để không làm chậm lúc khởi động app.
+VARIANT_FORMATS = {
+    "jpg": ("IMWRITE_JPEG_QUALITY", 85),
+    "webp": ("IMWRITE_WEBP_QUALITY", 80),
+}
+DEFAULT_FORMAT = "jpg"
+
+def variant_path(source_path: str, variant: str, fmt: str = DEFAULT_FORMAT) -> Optional[str]:
+    """
+    Đường dẫn file biến thể trong VARIANT_ROOT, giữ nguyên cấu trúc thư mục của ảnh gốc:
+    media/flowers/rose/abc.jpg -> media/variants/thumb/flowers/rose/abc.webp
+    """
+    relative_path = os.path.relpath(os.path.abspath(source_path), MEDIA_ROOT)
+    if relative_path.startswith(os.pardir) or relative_path.startswith("variants" + os.sep):
+        return None
+    base_name = os.path.splitext(relative_path)[0]
+    return os.path.join(VARIANT_ROOT, variant, f"{base_name}.{fmt}")
+
+def _is_fresh(path: str, source_path: str) -> bool:
+    return os.path.isfile(path) and os.path.getmtime(path) >= os.path.getmtime(source_path)
+
+def generate_variant(source_path: str, variant: str, fmt: str = DEFAULT_FORMAT, img=None) -> Optional[str]:
+    """
+    Tạo (hoặc dùng lại từ cache trên đĩa) một biến thể thu nhỏ của ảnh gốc.
+    Trả về đường dẫn file biến thể, hoặc None nếu không tạo được.
+    """
+    if variant not in VARIANT_SIZES or fmt not in VARIANT_FORMATS:
+        raise ValueError(f"Unknown image variant: {variant}.{fmt}")
+
+    target_path = variant_path(source_path, variant, fmt)
+    if target_path is None or not os.path.isfile(source_path):
+        return None
+    if _is_fresh(target_path, source_path):
+        return target_path
+
+    import cv2
+
+    if img is None:
+        img = cv2.imread(source_path, cv2.IMREAD_COLOR)
+    if img is None:
+        logger.warning(f"Cannot decode image for variants: {source_path}")
+        return None
+
+    # Chỉ thu nhỏ, không phóng to ảnh nhỏ hơn kích thước biến thể
+    height, width = img.shape[:2]
+    scale = VARIANT_SIZES[variant] / max(height, width)
+    if scale < 1:
+        img = cv2.resize(img, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    # Ghi ra file tạm rồi đổi tên để request song song không đọc phải file ghi dở
+    tmp_path = f"{os.path.splitext(target_path)[0]}.{uuid4().hex}.tmp.{fmt}"
+    try:
+        param, quality = VARIANT_FORMATS[fmt]
+        if not cv2.imwrite(tmp_path, img, [getattr(cv2, param), quality]):
+            logger.error(f"Could not encode {fmt} variant for {source_path}")
+            return None
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return target_path
+
+def generate_all_variants(source_path: str) -> None:
+    """Tạo trước mọi biến thể lúc upload. Lỗi chỉ được ghi log, không chặn việc lưu ảnh gốc."""
+    import cv2
+
+    try:
+        img = cv2.imread(source_path, cv2.IMREAD_COLOR)
+        if img is None:
+            logger.warning(f"Cannot decode uploaded image for variants: {source_path}")
+            return
+        for variant in VARIANT_SIZES:
+            for fmt in VARIANT_FORMATS:
+                generate_variant(source_path, variant, fmt, img=img)
+    except Exception as e:
+        logger.error(f"Error generating image variants for {source_path}: {e}")
+
+def delete_variants(source_path: str) -> None:
+    """Xóa mọi biến thể đã sinh ra từ ảnh gốc."""
+    for variant in VARIANT_SIZES:
+        for fmt in VARIANT_FORMATS:
+            path = variant_path(source_path, variant, fmt)
+            if path and os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.error(f"Error deleting image variant {path}: {e}")
@@ -0,0 +1,102 @@
+import os
+from typing import Optional
+from config.db import MEDIA_ROOT, PRODUCT_IMAGE_DIR_ABSOLUTE
+from utils.flower_types import FlowerType, flower_type_index
+from utils.image_cache import image_cache
+
+MEDIA_URL_PREFIX = "/media/"
+
+def media_path(*parts: str) -> Optional[str]:
+    """
+    Ghép các phần đường dẫn vào MEDIA_ROOT và giải symlink/"..". Trả về None nếu kết quả
+    nằm ngoài MEDIA_ROOT: gọi trước khi ghi hoặc xóa file từ đường dẫn lấy từ DB hay request.
+    """
+    media_root = os.path.realpath(MEDIA_ROOT)
+    absolute_path = os.path.realpath(os.path.join(media_root, *parts))
+    if not absolute_path.startswith(media_root + os.sep):
+        return None
+    return absolute_path
+
+def flower_image_path(flower) -> Optional[str]:
+    """Đường dẫn tuyệt đối tới ảnh của flower, hoặc None nếu không có file."""
+    flower_type = flower_type_index.by_name(flower.flower_type)
+    if not flower.image_url or flower_type is None:
+        return None
+    image_path = os.path.join(flower_type.flower_dir, os.path.basename(flower.image_url))
+    return image_path if os.path.isfile(image_path) else None
+
+def product_image_path(flower_type: Optional[FlowerType], product_id: int) -> Optional[str]:
+    """Đường dẫn tuyệt đối tới ảnh sản phẩm (.jpg hoặc .png), hoặc None nếu không có file."""
+    if flower_type is None:
+        return None
+    # Ảnh upload trước đây nằm trong thư mục viết hoa theo tên hiển thị (flowers_shop/Daisy)
+    folders = (flower_type.product_dir, media_path(PRODUCT_IMAGE_DIR_ABSOLUTE, flower_type.name))
+    for folder in folders:
+        if folder is None:
+            continue
+        for ext in (".jpg", ".png"):
+            image_path = os.path.join(folder, f"{product_id}{ext}")
+            if os.path.isfile(image_path):
+                return image_path
+    return None
+
+def media_url(absolute_path: Optional[str]) -> Optional[str]:
+    """Chuyển đường dẫn file trong MEDIA_ROOT thành URL phục vụ bởi router /media/."""
+    if not absolute_path:
+        return None
+    relative_path = os.path.relpath(absolute_path, MEDIA_ROOT)
+    if relative_path.startswith(os.pardir):
+        return None
+    return MEDIA_URL_PREFIX + relative_path.replace(os.sep, "/")
+
+def encode_image_base64(absolute_path: Optional[str]) -> Optional[str]:
+    """
+    Mã hóa Base64 ảnh (chỉ dùng cho chế độ tương thích inline_images).
+    Kết quả được cache theo đường dẫn + mtime nên ảnh phổ biến không bị đọc lại từ đĩa.
+    """
+    if not absolute_path:
+        return None
+    return image_cache.get_base64(absolute_path)
+
+def thumbnail_url(absolute_path: Optional[str], variant: str = "thumb") -> Optional[str]:
+    """URL của biến thể thu nhỏ; router /media/ sinh biến thể ở lần request đầu tiên."""
+    url = media_url(absolute_path)
+    return f"{url}?variant={variant}" if url else None
+
+def attach_image(data: dict, absolute_path: Optional[str], inline_images: bool = False) -> dict:
+    """
+    Thêm `media_url` và `thumbnail_url` vào dữ liệu trả về. Với `inline_images=True`
+    (client cũ) thêm cả `image_base64`.
+    """
+    data["media_url"] = media_url(absolute_path)
+    data["thumbnail_url"] = thumbnail_url(absolute_path)
+    if inline_images:
+        data["image_base64"] = encode_image_base64(absolute_path)
+    return data
+
+def flower_to_dict(flower, inline_images: bool = False) -> dict:
+    """Chuyển flower thành dictionary kèm URL ảnh (và Base64 nếu client yêu cầu)."""
+    flower_dict = {
+        "id": flower.id,
+        "name": flower.name,
+        "description": flower.description,
+        "price": float(flower.price),
+        "stock_quantity": flower.stock_quantity,
+        "flower_type": flower.flower_type,
+        "image_url": flower.image_url,
+        "created_at": flower.created_at,
+        "updated_at": flower.updated_at
+    }
+    return attach_image(flower_dict, flower_image_path(flower), inline_images)
+
+def product_to_dict(product, inline_images: bool = False) -> dict:
+    """
+    Chuyển sản phẩm thành dictionary kèm URL ảnh (.jpg hoặc .png),
+    thêm Base64 nếu client yêu cầu `inline_images`.
+    """
+    product_dict = product.__dict__.copy()
+    product_dict.pop("_sa_instance_state", None)
+
+    # Xây dựng đường dẫn hình ảnh dựa trên FlowerTypeID và ID sản phẩm
+    image_path = product_image_path(flower_type_index.get(product.FlowerTypeID), product.id)
+    return attach_image(product_dict, image_path, inline_images)
@@ -1,23 +1,99 @@
+import base64
+import bisect
+import binascii
+import json
 import math
-import numpy as np
-import pandas as pd
+from typing import Optional, Sequence
+from sqlalchemy.orm import Query
 
-def paginate_dataframe(df: pd.DataFrame, page: int = 1, per_page: int = 5) -> dict:
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df.fillna(0, inplace=True)
+def encode_cursor(last_key, page: int) -> str:
+    """Mã hóa vị trí trang tiếp theo thành token mờ (opaque) an toàn cho URL."""
+    payload = json.dumps({"k": last_key, "p": page}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
 
-    total_records = len(df)
+def _is_int(value) -> bool:
+    # bool là lớp con của int trong Python, nhưng true/false không phải id hay số trang
+    return isinstance(value, int) and not isinstance(value, bool)
 
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
+def decode_cursor(cursor: str) -> dict:
+    """
+    Giải mã token do encode_cursor tạo ra. Ném ValueError (router trả 400) nếu token không hợp lệ:
+    "k" phải là id nguyên vì được so sánh thẳng với cột khóa, "p" là số trang >= 1.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_key, page = payload["k"], payload["p"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    if not _is_int(last_key) or not _is_int(page) or page < 1:
+        raise ValueError("Invalid pagination cursor")
+    return {"k": last_key, "p": page}
 
-    paginated_df = df.iloc[start_idx:end_idx]
+def paginate_query(query: Query, key_column, page: int = 1, per_page: int = 10, cursor: Optional[str] = None) -> dict:
+    """
+    Phân trang ngay trong cơ sở dữ liệu trên một cột khóa có index (thường là id).
 
-    paginated_data = paginated_df.to_dict(orient='records')
+    - Có `cursor`: keyset pagination (WHERE key > last_key ORDER BY key LIMIT n),
+      chi phí trang N bằng chi phí trang 1.
+    - Không có `cursor`: dùng LIMIT/OFFSET theo `page` (tương thích client cũ).
+
+    Luôn trả về `next_cursor` để client chuyển sang keyset ở các trang sau.
+    """
+    page = max(page, 1)
+    per_page = max(per_page, 1)
+
+    # Bỏ ORDER BY khi đếm để MySQL không phải sắp xếp vô ích
+    total_records = query.order_by(None).count()
+
+    ordered = query.order_by(key_column)
+    if cursor:
+        position = decode_cursor(cursor)
+        page = position["p"]
+        ordered = ordered.filter(key_column > position["k"])
+    else:
+        ordered = ordered.offset((page - 1) * per_page)
+
+    # Lấy thêm 1 bản ghi để biết còn trang sau hay không
+    items = ordered.limit(per_page + 1).all()
+    return _page_result(items, key_column, total_records, page, per_page)
+
+def _page_result(items: list, key_column, total_records: int, page: int, per_page: int) -> dict:
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(getattr(items[-1], key_column.key), page + 1)
 
     return {
-        "data": paginated_data,
+        "data": items,
         "total_record": total_records,
         "page": page,
-        "per_page": per_page
-    }
\ No newline at end of file
+        "per_page": per_page,
+        "next_cursor": next_cursor
+    }
+
+def paginate_keyed(rows: Sequence[dict], key: str = "id", page: int = 1, per_page: int = 10, cursor: Optional[str] = None) -> dict:
+    """
+    Phân trang danh sách dict đã sắp xếp tăng dần theo khóa nguyên `key` (ví dụ bảng tham chiếu
+    đã cache), cùng định dạng và cùng loại cursor (giá trị khóa cuối trang) với paginate_query:
+    cursor cũ vẫn dùng được khi dữ liệu chuyển từ database sang bộ nhớ. Tìm vị trí bằng bisect.
+    """
+    page = max(page, 1)
+    per_page = max(per_page, 1)
+    if cursor:
+        position = decode_cursor(cursor)
+        page = position["p"]
+        start = bisect.bisect_right(rows, position["k"], key=lambda row: row[key])
+    else:
+        start = (page - 1) * per_page
+    data = list(rows[start:start + per_page])
+    has_next = start + per_page < len(rows)
+    return {
+        "data": data,
+        "total_record": len(rows),
+        "page": page,
+        "per_page": per_page,
+        "next_cursor": encode_cursor(data[-1][key], page + 1) if has_next and data else None
+    }
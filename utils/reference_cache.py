@@ -0,0 +1,111 @@
+import os
+import time
+from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import ReferenceVersions
+
+# Khoảng thời gian tối đa (giây) một worker dùng bản cache trước khi hỏi lại số phiên bản trong DB,
+# tức độ trễ lớn nhất để thay đổi từ worker khác được thấy. Worker thực hiện ghi thấy ngay.
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", "1"))
+
+async def bump_version(db: AsyncSession, table_name: str) -> None:
+    """
+    Tăng số phiên bản của bảng trong transaction hiện tại (commit cùng với thay đổi dữ liệu).
+    Dòng của mỗi bảng được tạo sẵn (migration 0003 hoặc init-db --create-all); không tự chèn ở đây
+    vì hai worker cùng chèn lần đầu sẽ trùng khóa chính.
+    """
+    result = await db.execute(
+        update(ReferenceVersions)
+        .where(ReferenceVersions.TableName == table_name)
+        .values(Version=ReferenceVersions.Version + 1)
+    )
+    if result.rowcount == 0:
+        raise RuntimeError(f"ReferenceVersions has no row for {table_name}; run `python manage.py init-db`")
+
+class ReferenceCache:
+    """
+    Cache toàn bộ một bảng tham chiếu nhỏ (vài chục dòng, hiếm khi đổi) trong tiến trình,
+    dạng danh sách dict sắp xếp theo id, để danh sách/phân trang/tra theo id không cần truy vấn.
+
+    Mỗi lần ghi tăng ReferenceVersions.Version trong cùng transaction (commit_changes). Các worker
+    đọc lại số phiên bản (một truy vấn theo khóa chính) tối đa mỗi `check_seconds` giây và chỉ tải
+    lại bảng khi số này khác bản đang cache.
+
+    `invalidate()` tăng `_generation`: một lần tải bắt đầu trước khi worker này ghi và xong sau
+    khi ghi không được lưu vào cache, để worker thực hiện ghi luôn thấy ngay dữ liệu của mình.
+    """
+
+    def __init__(self, model, check_seconds: float = REFERENCE_CACHE_CHECK_SECONDS):
+        self.model = model
+        self.table_name = model.__tablename__
+        self.check_seconds = check_seconds
+        self._columns = [getattr(model, column.key) for column in model.__table__.columns]
+        self._rows = None  # list[dict] theo id tăng dần; None = chưa tải hoặc đã bị vô hiệu
+        self._by_id = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.version_checks = 0
+        self.loads = 0
+        self.stale_loads = 0
+
+    async def rows(self, db: AsyncSession) -> List[dict]:
+        now = time.monotonic()
+        if self._rows is not None and now - self._checked_at < self.check_seconds:
+            self.hits += 1
+            return self._rows
+
+        # Đọc số phiên bản trước rồi mới đọc dữ liệu: nếu có ghi xen giữa, lần kiểm tra sau
+        # thấy phiên bản mới hơn và tải lại, không bao giờ giữ dữ liệu cũ với phiên bản mới
+        generation = self._generation
+        version = await db.scalar(
+            select(ReferenceVersions.Version).where(ReferenceVersions.TableName == self.table_name)
+        ) or 0
+        self.version_checks += 1
+        if self._rows is not None and version == self._version:
+            self._checked_at = now
+            self.hits += 1
+            return self._rows
+
+        result = await db.execute(select(*self._columns).order_by(self.model.id))
+        rows = [dict(row._mapping) for row in result]
+        if generation != self._generation:
+            # Worker này đã ghi trong lúc đang tải: trả kết quả cho request hiện tại nhưng không cache
+            self.stale_loads += 1
+            return rows
+        self._rows, self._by_id = rows, {row["id"]: row for row in rows}
+        self._version = version
+        self._checked_at = now
+        self.loads += 1
+        return rows
+
+    async def get(self, db: AsyncSession, row_id: int) -> Optional[dict]:
+        rows = await self.rows(db)
+        if rows is not self._rows:
+            # Kết quả tải không được cache (xem rows): tìm trực tiếp trong danh sách vừa đọc
+            return next((row for row in rows if row["id"] == row_id), None)
+        return self._by_id.get(row_id)
+
+    async def commit_changes(self, db: AsyncSession) -> None:
+        """Thay cho db.commit() ở các hàm create/update/delete của bảng tham chiếu."""
+        await bump_version(db, self.table_name)
+        await db.commit()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._rows = None
+
+    def stats(self) -> dict:
+        return {
+            "table": self.table_name,
+            "rows": len(self._rows) if self._rows is not None else None,
+            "version": self._version,
+            "check_seconds": self.check_seconds,
+            "hits": self.hits,
+            "version_checks": self.version_checks,
+            "loads": self.loads,
+            "stale_loads": self.stale_loads,
+        }
@@ -0,0 +1,103 @@
+import os
+import hashlib
+from typing import BinaryIO, Tuple
+from uuid import uuid4
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
+from utils.image_probe import ImageSizeProbe
+
+# Giới hạn cho mỗi file upload và kích thước ảnh (tính bằng pixel) trước khi giải mã
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(50_000_000)))
+# Giới hạn cả request multipart (file + các field form)
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(MAX_UPLOAD_BYTES + 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+class _UploadGuard:
+    """Đếm byte, băm SHA-256 và kiểm tra kích thước ảnh từ header trong lúc đọc từng chunk."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        # Header được phân tích dần theo từng chunk, không giới hạn vị trí của SOF trong file
+        self._probe = ImageSizeProbe()
+        self._dimensions_checked = False
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise _too_large(f"File too large (max {self.max_bytes} bytes)")
+        self.hasher.update(chunk)
+        if not self._dimensions_checked:
+            self._probe.feed(chunk)
+            if self._probe.done:
+                self._check_dimensions()
+
+    def finish(self) -> str:
+        if self.size == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+        if not self._dimensions_checked:
+            self._check_dimensions()
+        return self.hasher.hexdigest()
+
+    def _check_dimensions(self) -> None:
+        self._dimensions_checked = True
+        probed = self._probe.result
+        if probed is None:
+            # Không đọc được kích thước thì không áp được giới hạn pixel: không để OpenCV giải mã
+            raise HTTPException(status_code=415, detail="Unsupported image format (JPEG or PNG required)")
+        if probed[1] * probed[2] > MAX_IMAGE_PIXELS:
+            raise _too_large(f"Image dimensions too large ({probed[1]}x{probed[2]}, max {MAX_IMAGE_PIXELS} pixels)")
+
+async def read_upload(upload_file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[bytearray, str]:
+    """
+    Đọc file upload theo từng chunk vào một buffer giới hạn `max_bytes`.
+    Trả về (nội dung, sha256 hex). Ném HTTPException 413 ngay khi vượt giới hạn
+    dung lượng hoặc số pixel (đọc từ header, trước khi giải mã), 415 nếu không phải
+    JPEG/PNG và 400 nếu file rỗng.
+    """
+    guard = _UploadGuard(max_bytes)
+    buffer = bytearray()
+    while True:
+        chunk = await upload_file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        guard.feed(chunk)
+        buffer += chunk
+    return buffer, guard.finish()
+
+def save_upload(source: BinaryIO, destination: str, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """
+    Ghi file upload thẳng xuống đĩa theo từng chunk (bộ nhớ dùng không phụ thuộc kích thước file).
+    Ghi ra file tạm rồi đổi tên; file tạm bị xóa nếu vượt giới hạn. Trả về sha256 hex.
+    """
+    guard = _UploadGuard(max_bytes)
+    tmp_path = f"{destination}.{uuid4().hex}.part"
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                guard.feed(chunk)
+                buffer.write(chunk)
+        content_hash = guard.finish()
+        os.replace(tmp_path, destination)
+        return content_hash
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+async def limit_request_body(request: Request, call_next):
+    """Middleware: từ chối sớm request có Content-Length vượt MAX_REQUEST_BYTES."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body too large (max {MAX_REQUEST_BYTES} bytes)"}
+        )
+    return await call_next(request)